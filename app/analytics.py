@@ -0,0 +1,141 @@
+"""
+Pre-aggregated analytics for Success-Diary application.
+
+Implements the hybrid aggregated API from ADR-0007: each endpoint returns
+Chart.js-ready data computed with a single SQL GROUP BY, and results are
+kept in a per-user in-process cache. Instead of a blind TTL, cached charts
+are tied to the user's UserStats.updated_at, which every entry write
+changes, whichever process made it (other workers, the importer CLI,
+``python -m app.stats rebuild``). Writes in this process also drop the
+cache straight away through notify_entries_changed().
+"""
+
+import os
+from datetime import date, timedelta
+from sqlalchemy import extract, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.cache import LRUCache, on_entries_changed
+from app.models import Entry
+from app.stats import get_user_stats
+
+ANALYTICS_CACHE_MAX_USERS = int(os.getenv("ANALYTICS_CACHE_MAX_USERS", 1024))
+
+# user_id -> (stats updated_at, {(chart_name, params...): chart_data})
+analytics_cache = LRUCache(max_size=ANALYTICS_CACHE_MAX_USERS)
+
+WEEKDAY_LABELS = ["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
+SCORE_RANGE = range(1, 6)
+
+# Chart colours shared with the Tailwind palette used across the templates
+BLUE = "rgb(59, 130, 246)"
+BLUE_FILL = "rgba(59, 130, 246, 0.1)"
+GREEN_FILL = "rgba(16, 185, 129, 0.6)"
+PURPLE_FILL = "rgba(139, 92, 246, 0.6)"
+
+
+@on_entries_changed
+def invalidate_user_analytics(user_id: str) -> None:
+    """Drop every cached chart for a user after their entries change."""
+    analytics_cache.invalidate(user_id)
+
+
+async def _cached(db: AsyncSession, user_id: str, key: tuple, compute):
+    """
+    Return a cached chart for the user, computing and storing it on a miss.
+    
+    Costs one primary-key read of the stats row: charts cached before the
+    user's last entry write are discarded.
+    """
+    version = (await get_user_stats(db, user_id)).updated_at
+    cached = analytics_cache.get(user_id)
+    if cached is None or cached[0] != version:
+        cached = (version, {})
+        analytics_cache.set(user_id, cached)
+    user_charts = cached[1]
+    if key not in user_charts:
+        user_charts[key] = await compute()
+    return user_charts[key]
+
+
+async def get_mood_trends(db: AsyncSession, user_id: str, today: date, days: int = 30) -> dict:
+    """
+    Daily average rating over the last `days` days, ending at the user's today.
+    
+    Days without an entry are returned as null so the line chart shows gaps.
+    """
+    async def compute():
+        start = today - timedelta(days=days - 1)
+        result = await db.execute(
+            select(Entry.entry_date, func.avg(Entry.score))
+            .where(
+                Entry.user_id == user_id,
+                Entry.is_archived == False,
+                Entry.entry_date >= start,
+                Entry.entry_date <= today
+            )
+            .group_by(Entry.entry_date)
+        )
+        by_date = {entry_date: round(float(avg), 2) for entry_date, avg in result.all()}
+        labels = [start + timedelta(days=i) for i in range(days)]
+        return {
+            "labels": [d.isoformat() for d in labels],
+            "datasets": [{
+                "label": "Overall Rating",
+                "data": [by_date.get(d) for d in labels],
+                "borderColor": BLUE,
+                "backgroundColor": BLUE_FILL
+            }]
+        }
+
+    return await _cached(db, user_id, ("mood_trends", today, days), compute)
+
+
+async def get_weekday_distribution(db: AsyncSession, user_id: str) -> dict:
+    """Entry count and average rating for each day of the week."""
+    async def compute():
+        weekday = extract('dow', Entry.entry_date)
+        result = await db.execute(
+            select(weekday, func.count(Entry.id), func.avg(Entry.score))
+            .where(Entry.user_id == user_id, Entry.is_archived == False)
+            .group_by(weekday)
+        )
+        rows = {int(day): (count, float(avg)) for day, count, avg in result.all()}
+        return {
+            "labels": WEEKDAY_LABELS,
+            "datasets": [
+                {
+                    "label": "Average Rating",
+                    "data": [round(rows[d][1], 2) if d in rows else None for d in range(7)],
+                    "backgroundColor": GREEN_FILL
+                },
+                {
+                    "label": "Entries",
+                    "data": [rows[d][0] if d in rows else 0 for d in range(7)],
+                    "backgroundColor": BLUE_FILL,
+                    "hidden": True
+                }
+            ]
+        }
+
+    return await _cached(db, user_id, ("weekday_distribution",), compute)
+
+
+async def get_score_histogram(db: AsyncSession, user_id: str) -> dict:
+    """Number of entries at each rating."""
+    async def compute():
+        result = await db.execute(
+            select(Entry.score, func.count(Entry.id))
+            .where(Entry.user_id == user_id, Entry.is_archived == False)
+            .group_by(Entry.score)
+        )
+        counts = dict(result.all())
+        return {
+            "labels": [str(score) for score in SCORE_RANGE],
+            "datasets": [{
+                "label": "Entries",
+                "data": [counts.get(score, 0) for score in SCORE_RANGE],
+                "backgroundColor": PURPLE_FILL
+            }]
+        }
+
+    return await _cached(db, user_id, ("score_histogram",), compute)
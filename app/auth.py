@@ -15,6 +15,8 @@ from httpx_oauth.clients.github import GitHubOAuth2
 from sqlalchemy import update
 from app.models import User, UserCreate
 from app.database import get_async_session
+from app.cache import invalidate_user
+from app.stats import touch_user_stats
 import os
 from dotenv import load_dotenv
 
@@ -83,6 +85,7 @@ class UserManager(UUIDIDMixin, BaseUserManager[User, uuid.UUID]):
             )
             await session.commit()
             break
+        invalidate_user(user.id)
         
         message = MessageSchema(
             subject="Success Diary - Verify your email",
@@ -144,6 +147,23 @@ class UserManager(UUIDIDMixin, BaseUserManager[User, uuid.UUID]):
                 detail="An account with this email already exists. Please try logging in instead."
             )
 
+    async def on_after_update(
+        self, user: User, update_dict: dict, request: Optional[Request] = None
+    ):
+        # Pages render the display name and email, so cached copies are stale
+        await touch_user_stats(self.user_db.session, str(user.id))
+        await self.user_db.session.commit()
+        invalidate_user(user.id)
+
+    async def on_after_verify(self, user: User, request: Optional[Request] = None):
+        invalidate_user(user.id)
+
+    async def on_after_reset_password(self, user: User, request: Optional[Request] = None):
+        invalidate_user(user.id)
+
+    async def on_after_delete(self, user: User, request: Optional[Request] = None):
+        invalidate_user(user.id)
+
     async def on_after_forgot_password(
         self, user: User, token: str, request: Optional[Request] = None
     ):
@@ -226,6 +246,7 @@ class UserManager(UUIDIDMixin, BaseUserManager[User, uuid.UUID]):
             session.add(user)
             await session.commit()
             break
+        invalidate_user(user.id)
         
         message = MessageSchema(
             subject="Success Diary - Verify your email",
@@ -0,0 +1,113 @@
+"""
+In-process caching for Success-Diary application.
+
+Provides a small bounded LRU cache with optional per-entry TTL, and the
+authenticated-user cache used by get_current_user_safe so that every page
+load does not pay a database round trip to reload the User row.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    Thread-safe LRU cache with bounded size and optional time-to-live.
+
+    Attributes:
+        max_size: Maximum number of entries kept before evicting the least recently used
+        ttl_seconds: Seconds an entry stays valid, None for no expiry, or 0 to disable caching
+    """
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: Optional[float] = None):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for key, or default if missing or expired."""
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING:
+                return default
+
+            value, expires_at = item
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store value under key, evicting the least recently used entry if full (a TTL of 0 disables caching)."""
+        if self.ttl_seconds is not None and self.ttl_seconds <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds is not None else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop a single key if present."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop every cached entry."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# Authenticated-user cache keyed by the JWT "sub" claim (the user's UUID string).
+# Short TTL bounds staleness for changes made outside this process; writes made
+# through this process call invalidate_user() explicitly. A TTL of 0 disables it.
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", 30))
+USER_CACHE_MAX_SIZE = int(os.getenv("USER_CACHE_MAX_SIZE", 1024))
+
+user_cache = LRUCache(max_size=USER_CACHE_MAX_SIZE, ttl_seconds=USER_CACHE_TTL_SECONDS)
+
+
+def get_cached_user(user_id: str):
+    """Return the cached User for a token subject, or None."""
+    return user_cache.get(str(user_id))
+
+
+def cache_user(user) -> None:
+    """Cache a freshly loaded User row under its id."""
+    user_cache.set(str(user.id), user)
+
+
+def invalidate_user(user_id) -> None:
+    """Invalidate the cached User after its row has changed."""
+    user_cache.invalidate(str(user_id))
+
+
+# Entry write notifications. Caches derived from a user's entries register a
+# listener here; the entry write routes call notify_entries_changed() after
+# committing so derived data is invalidated by writes rather than by a TTL.
+_entry_change_listeners: list[Callable[[str], None]] = []
+
+
+def on_entries_changed(listener: Callable[[str], None]) -> Callable[[str], None]:
+    """Register a listener called with the user id whenever that user's entries change."""
+    _entry_change_listeners.append(listener)
+    return listener
+
+
+def notify_entries_changed(user_id) -> None:
+    """Tell every registered cache that a user's entries were written."""
+    for listener in _entry_change_listeners:
+        listener(str(user_id))
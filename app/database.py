@@ -1,53 +1,126 @@
-from sqlmodel import SQLModel, create_engine
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+import os
+from dotenv import load_dotenv
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
-DATABASE_URL = "sqlite+aiosqlite:///./db.sqlite3"
-engine = create_async_engine(DATABASE_URL, echo=False)
+load_dotenv()
+
+
+def normalize_database_url(url: str) -> str:
+    """
+    Map a configured database URL onto the async driver the app runs on.
+    
+    Plain ``sqlite://`` URLs use aiosqlite and ``postgresql://`` (or the
+    ``postgres://`` alias) URLs use asyncpg; URLs that already name a
+    driver are returned unchanged.
+    """
+    for prefix, async_prefix in (
+        ("sqlite://", "sqlite+aiosqlite://"),
+        ("postgresql://", "postgresql+asyncpg://"),
+        ("postgres://", "postgresql+asyncpg://"),
+    ):
+        if url.startswith(prefix):
+            return async_prefix + url[len(prefix):]
+    return url
+
+
+DATABASE_URL = normalize_database_url(os.getenv("DATABASE_URL", "sqlite:///./db.sqlite3"))
+
+# SQLite connection tuning, applied to every new pooled connection.
+# WAL lets readers run alongside the single writer instead of blocking on it;
+# synchronous=NORMAL is durable in WAL mode except for the last transactions
+# before a power loss; busy_timeout makes writers wait for the lock instead
+# of failing with "database is locked".
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", 256 * 1024 * 1024))  # bytes
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", -64000))  # negative = KiB per connection
+SQLITE_TEMP_STORE = os.getenv("SQLITE_TEMP_STORE", "MEMORY")
+
+# Connection pool sizing. Recycling bounds connection lifetime so server-side
+# idle timeouts (PostgreSQL, proxies such as PgBouncer) never hand out dead connections.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+
+
+def sqlite_pragmas() -> list[tuple[str, object]]:
+    """PRAGMA settings applied to each SQLite connection, in order."""
+    return [
+        ("journal_mode", SQLITE_JOURNAL_MODE),
+        ("synchronous", SQLITE_SYNCHRONOUS),
+        ("busy_timeout", SQLITE_BUSY_TIMEOUT_MS),
+        ("mmap_size", SQLITE_MMAP_SIZE),
+        ("cache_size", SQLITE_CACHE_SIZE),
+        ("temp_store", SQLITE_TEMP_STORE),
+    ]
+
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record=None) -> None:
+    """Engine "connect" listener that tunes a new SQLite DBAPI connection."""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in sqlite_pragmas():
+            cursor.execute(f"PRAGMA {name} = {value}")
+    finally:
+        cursor.close()
+
+
+def tune_sqlite_engine(sync_engine: Engine) -> None:
+    """Apply the SQLite PRAGMAs to every connection the engine opens."""
+    if sync_engine.dialect.name == "sqlite":
+        event.listen(sync_engine, "connect", apply_sqlite_pragmas)
+
+
+def create_app_engine(url: str = DATABASE_URL, **kwargs) -> AsyncEngine:
+    """Create the application's async engine with pool sizing and connection tuning."""
+    engine = create_async_engine(
+        url,
+        echo=False,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        **kwargs
+    )
+    tune_sqlite_engine(engine.sync_engine)
+    return engine
+
+
+engine = create_app_engine()
 
 async_session_maker = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 async def init_db() -> None:
-    # Import all models to ensure they're registered
-    from app.models import User, Entry, Base
-    import os
+    """Bring the database schema up to date (a single version lookup when it already is)."""
+    from app.migrations import run_migrations
     
-    # Ensure the database directory exists and is writable
-    db_path = "./db.sqlite3"
-    if os.path.exists(db_path):
-        print(f"Database file exists: {db_path}")
-        print(f"Database file permissions: {oct(os.stat(db_path).st_mode)[-3:]}")
+    url = make_url(DATABASE_URL)
+    if url.get_backend_name() == "sqlite" and url.database:
+        # Ensure the database directory exists and is writable
+        db_path = url.database
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        if not os.path.exists(db_path):
+            print(f"Database file does not exist, will be created: {db_path}")
     else:
-        print(f"Database file does not exist, will be created: {db_path}")
+        print(f"Using {url.get_backend_name()} database: {url.render_as_string(hide_password=True)}")
     
     try:
-        async with engine.begin() as conn:
-            # Create SQLAlchemy tables (for User)
-            await conn.run_sync(Base.metadata.create_all)
-            # Create SQLModel tables (for Entry)
-            await conn.run_sync(SQLModel.metadata.create_all)
-        print("Database tables created successfully")
+        applied = await run_migrations(engine)
     except Exception as e:
-        print(f"Database initialization error: {e}")
-        # Fallback to sync creation
-        try:
-            from sqlmodel import create_engine as sync_create_engine
-            sync_engine = sync_create_engine("sqlite:///./db.sqlite3", echo=True)
-            Base.metadata.create_all(sync_engine)
-            SQLModel.metadata.create_all(sync_engine)
-            print("Database created using sync fallback")
-        except Exception as sync_error:
-            print(f"Sync fallback also failed: {sync_error}")
-            raise
+        print(f"Database migration error: {e}")
+        raise
+    
+    for name in applied:
+        print(f"Applied migration {name}")
+    if not applied:
+        print("Database schema is up to date")
 
 async def get_async_session():
     async with async_session_maker() as session:
         yield session
-
-# Keep sync session for SQLModel Entry operations
-from sqlmodel import Session, create_engine as sync_create_engine
-sync_engine = sync_create_engine("sqlite:///./db.sqlite3", echo=False)
-
-def get_session():
-    with Session(sync_engine) as session:
-        yield session
@@ -0,0 +1,173 @@
+"""
+Benchmarks for the database layer.
+
+The default run is a mixed workload against a throwaway SQLite database:
+reader tasks list the latest history entries and read the stats row while
+writer tasks add entries through the same path as POST /add (insert,
+stats delta, commit). Compare the tuned engine with SQLite's defaults:
+
+    python -m app.db_benchmark
+    python -m app.db_benchmark --baseline
+
+--list-memory instead measures the peak memory of listing a user's
+entries as full ORM rows versus the EntrySummary objects the list views
+build from the card columns:
+
+    python -m app.db_benchmark --list-memory --entries 5000
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from app.database import create_app_engine
+from app.migrations import run_migrations
+from app.models import Entry
+from app.stats import apply_entry_added, get_user_stats, rebuild_user_stats
+from app.entry_repository import ENTRY_CARD_COLUMNS, list_active_entries, to_summaries
+
+
+def _entry_values(user_id: str, entry_date: date, journal_length: int = 1100) -> dict:
+    return {
+        "user_id": user_id,
+        "entry_date": entry_date,
+        "success_1": "Finished the quarterly report",
+        "gratitude_1": "A long walk after lunch",
+        "anxiety_1": "Tomorrow's presentation",
+        "score": entry_date.toordinal() % 5 + 1,
+        "journal": ("Reflection " * (journal_length // 11 + 1))[:journal_length],
+    }
+
+
+async def _setup(engine, users: list[str], entries_per_user: int, journal_length: int = 1100) -> None:
+    """Create the schema and seed each user's history."""
+    await run_migrations(engine)
+    async with engine.begin() as conn:
+        for user_id in users:
+            start = date(2015, 1, 1)
+            await conn.execute(insert(Entry), [
+                _entry_values(user_id, start + timedelta(days=i), journal_length) for i in range(entries_per_user)
+            ])
+
+    async with AsyncSession(engine) as db:
+        for user_id in users:
+            await rebuild_user_stats(db, user_id)
+        await db.commit()
+
+
+async def _reader(session_maker, user_id: str, deadline: float, latencies: list, errors: list) -> None:
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            async with session_maker() as db:
+                await get_user_stats(db, user_id)
+                await list_active_entries(db, user_id, "newest_first")
+            latencies.append(time.perf_counter() - started)
+        except Exception as e:
+            errors.append(str(e))
+
+
+async def _writer(session_maker, user_id: str, first_date: date, deadline: float, latencies: list, errors: list) -> None:
+    entry_date = first_date
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            async with session_maker() as db:
+                entry = Entry(**_entry_values(user_id, entry_date))
+                db.add(entry)
+                await apply_entry_added(db, entry)
+                await db.commit()
+            latencies.append(time.perf_counter() - started)
+        except Exception as e:
+            errors.append(str(e))
+        entry_date += timedelta(days=1)
+
+
+def _summary(label: str, latencies: list, errors: list, duration: float) -> str:
+    if not latencies:
+        return f"{label:7s} 0 ops, {len(errors)} errors"
+    latencies = sorted(latencies)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return (
+        f"{label:7s} {len(latencies) / duration:8.1f} ops/s  "
+        f"p50={statistics.median(latencies) * 1000:6.1f}ms  p99={p99 * 1000:6.1f}ms  "
+        f"errors={len(errors)}"
+    )
+
+
+async def run_benchmark(readers: int, writers: int, duration: float, entries: int, baseline: bool) -> None:
+    """Run the mixed workload and print throughput and latency for reads and writes."""
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite+aiosqlite:///{os.path.join(directory, 'bench.sqlite3')}"
+        if baseline:
+            engine = create_async_engine(url)
+        else:
+            engine = create_app_engine(url)
+        session_maker = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+        users = [f"bench-user-{i}" for i in range(max(readers, writers))]
+        await _setup(engine, users, entries)
+
+        read_latencies, write_latencies, read_errors, write_errors = [], [], [], []
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(
+            *[_reader(session_maker, users[i % len(users)], deadline, read_latencies, read_errors) for i in range(readers)],
+            *[_writer(session_maker, users[i % len(users)], date(2030, 1, 1), deadline, write_latencies, write_errors) for i in range(writers)],
+        )
+        await engine.dispose()
+
+    print(f"{'baseline' if baseline else 'tuned'}: {readers} readers, {writers} writers, {duration:.0f}s, {entries} entries/user")
+    print(_summary("reads", read_latencies, read_errors, duration))
+    print(_summary("writes", write_latencies, write_errors, duration))
+    for message in sorted(set(read_errors + write_errors))[:5]:
+        print(f"  error: {message[:120]}")
+
+
+async def run_list_memory_benchmark(entries: int) -> None:
+    """Print peak memory and time for listing every entry of a user as ORM rows vs EntrySummary objects."""
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_app_engine(f"sqlite+aiosqlite:///{os.path.join(directory, 'bench.sqlite3')}")
+        # Journals at the 8,000 character limit, the worst case for list views
+        await _setup(engine, ["bench-user"], entries, journal_length=8000)
+
+        print(f"Listing {entries} entries (8,000 character journals)")
+        for label, stmt, build in (
+            ("full rows", select(Entry), lambda result: result.scalars().all()),
+            ("summaries", select(*ENTRY_CARD_COLUMNS), to_summaries),
+        ):
+            stmt = stmt.where(Entry.user_id == "bench-user").order_by(Entry.entry_date.desc())
+            # Timed and traced separately: tracemalloc slows allocation-heavy code
+            async with AsyncSession(engine) as db:
+                started = time.perf_counter()
+                rows = build(await db.execute(stmt))
+                elapsed = time.perf_counter() - started
+            async with AsyncSession(engine) as db:
+                tracemalloc.start()
+                rows = build(await db.execute(stmt))
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+            print(f"{label:13s} {len(rows)} rows  peak={peak / 1024 / 1024:7.1f} MiB  time={elapsed * 1000:7.1f}ms")
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mixed read/write database concurrency benchmark")
+    parser.add_argument("--readers", type=int, default=16, help="Concurrent reader tasks")
+    parser.add_argument("--writers", type=int, default=4, help="Concurrent writer tasks")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds to run")
+    parser.add_argument("--entries", type=int, default=1000, help="Entries seeded per user")
+    parser.add_argument("--baseline", action="store_true", help="Use SQLite and pool defaults instead of the tuned engine")
+    parser.add_argument("--list-memory", action="store_true", help="Measure memory of listing --entries entries instead")
+    args = parser.parse_args()
+
+    if args.list_memory:
+        asyncio.run(run_list_memory_benchmark(args.entries))
+    else:
+        asyncio.run(run_benchmark(args.readers, args.writers, args.duration, args.entries, args.baseline))
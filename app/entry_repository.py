@@ -0,0 +1,407 @@
+"""
+Async data access for Entry rows.
+
+All entry queries run on the aiosqlite-backed AsyncSession from
+app.database so that routes never block the event loop on SQLite I/O.
+"""
+
+from datetime import date, datetime, timedelta
+from sqlalchemy import Integer, and_, cast, distinct, extract, func, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import Entry, EntrySummary, UserStats
+
+# Number of entries rendered per archive page / infinite-scroll request
+ENTRIES_PAGE_SIZE = 30
+
+# Archive reason filter value selecting entries archived without a reason
+NO_ARCHIVE_REASON = "none"
+
+# Partial unique index allowing one active entry per user and local date.
+# PostgreSQL names it in violations; SQLite reports its columns instead.
+ACTIVE_ENTRY_DATE_INDEX = "ux_entry_user_active_entry_date"
+_SQLITE_ACTIVE_ENTRY_DATE_VIOLATION = "UNIQUE constraint failed: entry.user_id, entry.entry_date"
+
+# Columns rendered by partials/entry_card.html, in EntrySummary attribute
+# order. List views select only these, leaving the text fields (the journal
+# alone can be 8,000 characters) to the single-entry views.
+ENTRY_CARD_COLUMNS = tuple(getattr(Entry, name) for name in EntrySummary.__slots__)
+
+
+def to_summaries(rows) -> list[EntrySummary]:
+    """Build EntrySummary objects from rows of ENTRY_CARD_COLUMNS."""
+    return [EntrySummary(*row) for row in rows]
+
+
+def is_active_entry_date_conflict(error: IntegrityError) -> bool:
+    """Whether an IntegrityError is a violation of the one-active-entry-per-day index."""
+    message = str(error.orig)
+    return ACTIVE_ENTRY_DATE_INDEX in message or _SQLITE_ACTIVE_ENTRY_DATE_VIOLATION in message
+
+
+def _entry_order(column, sort_preference: str):
+    """Order by column honouring the user's sort preference."""
+    return column.asc() if sort_preference == 'oldest_first' else column.desc()
+
+
+async def get_user_entry(db: AsyncSession, user_id: str, entry_id: int) -> Entry | None:
+    """Get a single entry with all its text fields, verifying it belongs to the user."""
+    result = await db.execute(
+        select(Entry).where(Entry.id == entry_id, Entry.user_id == user_id)
+    )
+    return result.scalars().first()
+
+
+async def get_dashboard_entries(
+    db: AsyncSession,
+    user_id: str,
+    today: date,
+    limit: int = 3
+) -> tuple[list[EntrySummary], EntrySummary | None, UserStats | None]:
+    """
+    Recent entries, today's entry and the streaks for the dashboard in a single query.
+    
+    The user's stats row is joined to the union of the most recent active
+    entries and the active entry for the user's local today; the stats row
+    is a primary-key lookup and both halves of the union are index lookups.
+    
+    Args:
+        db: Async database session
+        user_id: Owner of the entries
+        today: The user's local date
+        limit: Number of recent entries to show
+        
+    Returns:
+        tuple: (recent entries newest first, today's entry or None, a
+        detached UserStats holding only the streak fields). Without a stats
+        row nothing is read and the result is ([], None, None).
+    """
+    active = (Entry.user_id == user_id, Entry.is_archived == False)
+    recent_ids = (
+        select(Entry.id)
+        .where(*active)
+        .order_by(Entry.entry_date.desc(), Entry.id.desc())
+        .limit(limit)
+    )
+    today_ids = select(Entry.id).where(*active, Entry.entry_date == today)
+    result = await db.execute(
+        select(UserStats.longest_streak, UserStats.streak_start, UserStats.streak_end, *ENTRY_CARD_COLUMNS)
+        .select_from(UserStats)
+        .outerjoin(Entry, and_(
+            Entry.user_id == UserStats.user_id,
+            or_(Entry.id.in_(recent_ids), Entry.id.in_(today_ids))
+        ))
+        .where(UserStats.user_id == user_id)
+        .order_by(Entry.entry_date.desc(), Entry.id.desc())
+    )
+    rows = result.all()
+    if not rows:
+        return [], None, None
+    
+    longest_streak, streak_start, streak_end = rows[0][:3]
+    streaks = UserStats(
+        user_id=user_id, longest_streak=longest_streak, streak_start=streak_start, streak_end=streak_end
+    )
+    # A user without active entries gets one row with no entry columns
+    entries = to_summaries(row[3:] for row in rows if row.id is not None)
+    
+    today_entry = next((entry for entry in entries if entry.entry_date == today), None)
+    if len(entries) > limit:
+        # Today's entry is not among the most recent ones, so it was the extra row
+        entries.remove(today_entry)
+    return entries, today_entry, streaks
+
+
+def period_date_range(year: int, month: int | None = None) -> tuple[date, date]:
+    """First and last day of a calendar year, or of one month in it."""
+    if month is None:
+        return date(year, 1, 1), date(year, 12, 31)
+    start = date(year, month, 1)
+    return start, (start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+
+
+def _period_conditions(year: int | None, month: int | None) -> list:
+    """Entry filters for an optional year and/or month."""
+    if year is not None:
+        # A date range keeps the filter on the entry_date index
+        start, end = period_date_range(year, month)
+        return [Entry.entry_date >= start, Entry.entry_date <= end]
+    if month is not None:
+        return [extract('month', Entry.entry_date) == month]
+    return []
+
+
+async def list_active_entries(
+    db: AsyncSession,
+    user_id: str,
+    sort_preference: str,
+    limit: int = ENTRIES_PAGE_SIZE,
+    year: int | None = None,
+    month: int | None = None
+) -> list[EntrySummary]:
+    """
+    Active entries in the user's sort order, newest or oldest first.
+
+    Args:
+        db: Async database session
+        user_id: Owner of the entries
+        sort_preference: 'newest_first' or 'oldest_first'
+        limit: Maximum number of entries to return
+        year: Only entries from this year
+        month: Only entries from this month (of every year unless year is given)
+
+    Returns:
+        list: EntrySummary objects ordered by (entry_date, id)
+    """
+    result = await db.execute(
+        select(*ENTRY_CARD_COLUMNS)
+        .where(Entry.user_id == user_id, Entry.is_archived == False, *_period_conditions(year, month))
+        .order_by(
+            _entry_order(Entry.entry_date, sort_preference),
+            _entry_order(Entry.id, sort_preference)
+        )
+        .limit(limit)
+    )
+    return to_summaries(result)
+
+
+async def get_active_entry_stats(db: AsyncSession, user_id: str) -> dict:
+    """Total count, score sum and distinct month count of active entries."""
+    month_key = extract('year', Entry.entry_date) * 100 + extract('month', Entry.entry_date)
+    result = await db.execute(
+        select(
+            func.count(Entry.id),
+            func.coalesce(func.sum(Entry.score), 0),
+            func.count(distinct(month_key))
+        ).where(Entry.user_id == user_id, Entry.is_archived == False)
+    )
+    entry_count, score_sum, month_count = result.one()
+    return {"entry_count": entry_count, "score_sum": int(score_sum), "month_count": month_count}
+
+
+async def get_archived_entry_stats(db: AsyncSession, user_id: str) -> dict:
+    """Count and score sum of archived entries."""
+    result = await db.execute(
+        select(func.count(Entry.id), func.coalesce(func.sum(Entry.score), 0))
+        .where(Entry.user_id == user_id, Entry.is_archived == True)
+    )
+    archived_count, archived_score_sum = result.one()
+    return {"archived_count": archived_count, "archived_score_sum": int(archived_score_sum)}
+
+
+async def has_other_active_entry_in_month(db: AsyncSession, user_id: str, entry: Entry) -> bool:
+    """Whether any active entry other than this one falls in the entry's calendar month."""
+    month_start = entry.entry_date.replace(day=1)
+    next_month = (month_start + timedelta(days=32)).replace(day=1)
+    result = await db.execute(
+        select(Entry.id)
+        .where(
+            Entry.user_id == user_id,
+            Entry.is_archived == False,
+            Entry.entry_date >= month_start,
+            Entry.entry_date < next_month,
+            Entry.id != entry.id
+        )
+        .limit(1)
+    )
+    return result.first() is not None
+
+
+async def list_month_facets(
+    db: AsyncSession,
+    user_id: str,
+    sort_preference: str = 'newest_first',
+    year: int | None = None,
+    month: int | None = None
+) -> list[dict]:
+    """
+    Every month with active entries, with its entry count and average score.
+    
+    One GROUP BY over the (user_id, is_archived, entry_date) index; the
+    result has one row per month, however long the history is.
+    
+    Args:
+        db: Async database session
+        user_id: Owner of the entries
+        sort_preference: 'newest_first' or 'oldest_first'
+        year: Only months of this year
+        month: Only this month (of every year unless year is given)
+        
+    Returns:
+        list: [{"year": int, "month": int, "count": int, "avg_score": float}] in display order
+    """
+    year_part = extract('year', Entry.entry_date)
+    month_part = extract('month', Entry.entry_date)
+    result = await db.execute(
+        select(year_part, month_part, func.count(Entry.id), func.avg(Entry.score))
+        .where(Entry.user_id == user_id, Entry.is_archived == False, *_period_conditions(year, month))
+        .group_by(year_part, month_part)
+        .order_by(_entry_order(year_part, sort_preference), _entry_order(month_part, sort_preference))
+    )
+    return [
+        {"year": int(y), "month": int(m), "count": count, "avg_score": float(avg or 0)}
+        for y, m, count, avg in result.all()
+    ]
+
+
+async def get_active_streak_runs(db: AsyncSession, user_id: str) -> dict:
+    """
+    Longest and most recent runs of consecutive days with an active entry, in one query.
+    
+    Active entries have distinct dates (one per day), so within a run of
+    consecutive days the date minus the row number is constant; grouping on
+    that difference yields every run without walking the dates in Python.
+    Reads only the (user_id, is_archived, entry_date) index.
+    
+    Returns:
+        dict: {"longest_streak": int, "streak_start": date | None, "streak_end": date | None}
+    """
+    position = func.row_number().over(order_by=Entry.entry_date)
+    if db.bind.dialect.name == "postgresql":
+        island = Entry.entry_date - cast(position, Integer)
+    else:
+        island = func.julianday(Entry.entry_date) - position
+    
+    dated = (
+        select(Entry.entry_date, island.label("island"))
+        .where(Entry.user_id == user_id, Entry.is_archived == False)
+        .subquery()
+    )
+    runs = (
+        select(
+            func.min(dated.c.entry_date).label("start"),
+            func.max(dated.c.entry_date).label("end"),
+            func.count().label("length")
+        )
+        .group_by(dated.c.island)
+        .subquery()
+    )
+    result = await db.execute(
+        select(runs.c.start, runs.c.end, func.max(runs.c.length).over())
+        .order_by(runs.c.end.desc())
+        .limit(1)
+    )
+    row = result.first()
+    if row is None:
+        return {"longest_streak": 0, "streak_start": None, "streak_end": None}
+    start, end, longest = row
+    return {"longest_streak": int(longest), "streak_start": start, "streak_end": end}
+
+
+def encode_archive_cursor(entry: EntrySummary) -> str:
+    """Encode the keyset position of an archived entry as an opaque cursor string."""
+    return f"{entry.archived_at.isoformat()}_{entry.id}"
+
+
+def decode_archive_cursor(cursor: str) -> tuple[datetime, int]:
+    """
+    Decode a cursor produced by encode_archive_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        archived_part, id_part = cursor.rsplit("_", 1)
+        archived_at, entry_id = datetime.fromisoformat(archived_part), int(id_part)
+    except ValueError:
+        raise ValueError(f"Invalid archive cursor: {cursor!r}") from None
+    # archived_at is stored as naive UTC, so an offset never came from encode_archive_cursor
+    if archived_at.tzinfo is not None:
+        raise ValueError(f"Invalid archive cursor: {cursor!r}")
+    return archived_at, entry_id
+
+
+def _archive_reason_condition(reason: str | None):
+    """Filter on archived_reason; NO_ARCHIVE_REASON selects entries archived without one."""
+    if reason == NO_ARCHIVE_REASON:
+        return Entry.archived_reason.is_(None)
+    return Entry.archived_reason == reason
+
+
+async def list_archived_entries_page(
+    db: AsyncSession,
+    user_id: str,
+    sort_preference: str,
+    cursor: str | None = None,
+    limit: int = ENTRIES_PAGE_SIZE,
+    reason: str | None = None
+) -> tuple[list[EntrySummary], str | None]:
+    """
+    One page of archived entries using keyset pagination on (archived_at, id).
+
+    Args:
+        db: Async database session
+        user_id: Owner of the entries
+        sort_preference: 'newest_first' or 'oldest_first'
+        cursor: Cursor returned with the previous page, None for the first page
+        limit: Maximum number of entries to return
+        reason: Only entries archived for this reason (NO_ARCHIVE_REASON for none)
+
+    Returns:
+        tuple: (entries, next_cursor) where next_cursor is None on the last page
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    ascending = sort_preference == 'oldest_first'
+    stmt = select(*ENTRY_CARD_COLUMNS).where(Entry.user_id == user_id, Entry.is_archived == True)
+    if reason:
+        stmt = stmt.where(_archive_reason_condition(reason))
+
+    if cursor:
+        after_archived_at, after_id = decode_archive_cursor(cursor)
+        if ascending:
+            stmt = stmt.where(or_(
+                Entry.archived_at > after_archived_at,
+                and_(Entry.archived_at == after_archived_at, Entry.id > after_id)
+            ))
+        else:
+            stmt = stmt.where(or_(
+                Entry.archived_at < after_archived_at,
+                and_(Entry.archived_at == after_archived_at, Entry.id < after_id)
+            ))
+
+    stmt = stmt.order_by(
+        _entry_order(Entry.archived_at, sort_preference),
+        _entry_order(Entry.id, sort_preference)
+    ).limit(limit + 1)
+
+    result = await db.execute(stmt)
+    entries = to_summaries(result)
+
+    next_cursor = None
+    if len(entries) > limit:
+        entries = entries[:limit]
+        next_cursor = encode_archive_cursor(entries[-1])
+    return entries, next_cursor
+
+
+async def list_archive_reason_facets(db: AsyncSession, user_id: str) -> list[dict]:
+    """
+    Number of archived entries per archive reason, most common first.
+
+    Returns:
+        list: [{"reason": str, "count": int}] with NO_ARCHIVE_REASON for entries archived without one
+    """
+    result = await db.execute(
+        select(Entry.archived_reason, func.count(Entry.id))
+        .where(Entry.user_id == user_id, Entry.is_archived == True)
+        .group_by(Entry.archived_reason)
+        .order_by(func.count(Entry.id).desc(), Entry.archived_reason)
+    )
+    return [
+        {"reason": reason or NO_ARCHIVE_REASON, "count": count}
+        for reason, count in result.all()
+    ]
+
+
+async def get_active_entry_on_date(db: AsyncSession, user_id: str, entry_date: date) -> Entry | None:
+    """The user's active entry for a local date (at most one, by the unique index)."""
+    result = await db.execute(
+        select(Entry).where(
+            Entry.user_id == user_id,
+            Entry.is_archived == False,
+            Entry.entry_date == entry_date
+        )
+    )
+    return result.scalars().first()
@@ -11,10 +11,9 @@ import uuid
 from typing import Optional
 from fastapi import Request, HTTPException
 from fastapi.responses import HTMLResponse, JSONResponse
-from fastapi.templating import Jinja2Templates
+from app.templating import templates
 
 logger = logging.getLogger(__name__)
-templates = Jinja2Templates(directory="templates")
 
 
 class ErrorData:
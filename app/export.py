@@ -0,0 +1,106 @@
+"""
+Streaming data export for Success-Diary application.
+
+Implements the CSV-first export from ADR-0008. Rows are read from the
+database in bounded chunks through a server-side cursor and written to the
+response as they arrive, so exporting years of history uses constant memory
+and the first bytes are sent immediately.
+"""
+
+import csv
+import io
+from datetime import date, datetime
+from typing import AsyncIterator, Optional
+from sqlalchemy import select
+from app.models import Entry
+
+# Rows fetched from the database per chunk (and per response write)
+EXPORT_CHUNK_SIZE = 500
+
+# CSV header -> Entry attribute, in column order
+EXPORT_COLUMNS = [
+    ("Date", "entry_date"),
+    ("Title", "title"),
+    ("Success_1", "success_1"),
+    ("Success_2", "success_2"),
+    ("Success_3", "success_3"),
+    ("Gratitude_1", "gratitude_1"),
+    ("Gratitude_2", "gratitude_2"),
+    ("Gratitude_3", "gratitude_3"),
+    ("Anxiety_1", "anxiety_1"),
+    ("Anxiety_2", "anxiety_2"),
+    ("Anxiety_3", "anxiety_3"),
+    ("Overall_Rating", "score"),
+    ("Journal_Text", "journal"),
+    ("Created_At", "created_at"),
+    ("Modified_At", "updated_at"),
+    ("Archived", "is_archived"),
+    ("Archived_At", "archived_at"),
+    ("Archived_Reason", "archived_reason"),
+]
+
+
+def _format_value(value) -> str:
+    """Format a column value for CSV output (UTC timestamps in ISO 8601 with Z)."""
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.replace(microsecond=0).isoformat() + "Z"
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return value
+
+
+def export_filename(today: date) -> str:
+    """Download filename for an export generated on `today`."""
+    return f"success_diary_export_{today.strftime('%Y%m%d')}.csv"
+
+
+async def stream_entries_csv(
+    user_id: str,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    archived: Optional[bool] = None
+) -> AsyncIterator[str]:
+    """
+    Yield a user's entries as CSV text, one chunk of rows at a time.
+    
+    Opens its own session because the response body is produced after the
+    request's dependencies have been torn down.
+    
+    Args:
+        user_id: Owner of the entries
+        start_date: Only entries on or after this date
+        end_date: Only entries on or before this date
+        archived: True for archived entries only, False for active only, None for all
+    """
+    from app.database import async_session_maker
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow([header for header, _ in EXPORT_COLUMNS])
+    yield buffer.getvalue()
+
+    stmt = (
+        select(*[getattr(Entry, attr) for _, attr in EXPORT_COLUMNS])
+        .where(Entry.user_id == user_id)
+        .order_by(Entry.entry_date.asc(), Entry.id.asc())
+        .execution_options(yield_per=EXPORT_CHUNK_SIZE)
+    )
+    if start_date:
+        stmt = stmt.where(Entry.entry_date >= start_date)
+    if end_date:
+        stmt = stmt.where(Entry.entry_date <= end_date)
+    if archived is not None:
+        stmt = stmt.where(Entry.is_archived == archived)
+
+    async with async_session_maker() as db:
+        result = await db.stream(stmt)
+        async for rows in result.partitions():
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows([_format_value(value) for value in row] for row in rows)
+            yield buffer.getvalue()
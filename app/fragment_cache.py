@@ -0,0 +1,101 @@
+"""
+Rendered fragment cache for entry cards.
+
+partials/entry_card.html is rendered for every entry on the dashboard, the
+history sections, search results and the archive. A card's HTML depends
+only on the entry row, the card variant (action_type) and the viewer's
+timezone, so rendered cards are kept per user and reused across requests.
+
+The key is (entry.id, entry.updated_at, action_type, timezone). Every ORM
+update of an Entry bumps updated_at (models.receive_before_update),
+archive and unarchive included, so a changed entry never matches its old
+card. On top of that, a user's cards are dropped whenever
+notify_entries_changed() fires after update_entry, archive/unarchive,
+delete_entry or an import.
+
+Memory is bounded on two levels, both evicted least recently used: at most
+ENTRY_CARD_CACHE_MAX_USERS users, each with at most
+ENTRY_CARD_CACHE_MAX_CARDS cards.
+"""
+
+import os
+from jinja2 import Environment, pass_context
+from jinja2.runtime import Context
+from markupsafe import Markup
+from app.cache import LRUCache, on_entries_changed
+from app.timezone_utils import UserClock
+
+ENTRY_CARD_TEMPLATE = "partials/entry_card.html"
+
+# A rendered card is about 1.4 KB, so the defaults cap the cache near 35 MB
+ENTRY_CARD_CACHE_MAX_USERS = int(os.getenv("ENTRY_CARD_CACHE_MAX_USERS", 128))
+ENTRY_CARD_CACHE_MAX_CARDS = int(os.getenv("ENTRY_CARD_CACHE_MAX_CARDS", 200))
+
+# user_id -> LRUCache of (entry_id, updated_at, action_type, timezone, is_fallback) -> Markup
+entry_card_cache = LRUCache(max_size=ENTRY_CARD_CACHE_MAX_USERS)
+entry_card_counters = {"hits": 0, "misses": 0}
+
+
+@on_entries_changed
+def invalidate_entry_cards(user_id: str) -> None:
+    """Drop every rendered card of a user after their entries change."""
+    entry_card_cache.invalidate(user_id)
+
+
+def _user_cards(user_id: str) -> LRUCache:
+    """The user's card cache, created on first use."""
+    cards = entry_card_cache.get(user_id)
+    if cards is None:
+        cards = LRUCache(max_size=ENTRY_CARD_CACHE_MAX_CARDS)
+        entry_card_cache.set(user_id, cards)
+    return cards
+
+
+def render_entry_card(environment: Environment, clock: UserClock, entry, action_type: str) -> Markup:
+    """
+    Rendered HTML of one entry card, from the cache when possible.
+
+    Args:
+        environment: Jinja environment holding partials/entry_card.html
+        clock: The viewer's UserClock, used to format the card's timestamps
+        entry: Entry or EntrySummary to render
+        action_type: Card variant: 'view', 'edit' or 'archive'
+
+    Returns:
+        Markup: The card HTML, safe to insert into an autoescaped template
+    """
+    cards = _user_cards(str(entry.user_id))
+    key = (entry.id, entry.updated_at, action_type, clock.timezone_name, clock.is_fallback)
+    html = cards.get(key)
+    if html is not None:
+        entry_card_counters["hits"] += 1
+        return html
+
+    entry_card_counters["misses"] += 1
+    # Timestamps are only formatted for cards that are actually rendered
+    times = clock.format_entry_times([entry])[entry.id]
+    html = Markup(environment.get_template(ENTRY_CARD_TEMPLATE).render(
+        entry=entry, action_type=action_type, times=times
+    ))
+    cards.set(key, html)
+    return html
+
+
+@pass_context
+def entry_card(context: Context, entry, action_type: str = 'view') -> Markup:
+    """Jinja global: {{ entry_card(entry, action_type) }}, with the request's UserClock passed as `clock`."""
+    return render_entry_card(context.environment, context["clock"], entry, action_type)
+
+
+def get_entry_card_cache_info() -> dict:
+    """Hit/miss counters and current size of the entry card cache."""
+    hits, misses = entry_card_counters["hits"], entry_card_counters["misses"]
+    lookups = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / lookups, 3) if lookups else None,
+        "users": len(entry_card_cache),
+        "max_users": ENTRY_CARD_CACHE_MAX_USERS,
+        "max_cards_per_user": ENTRY_CARD_CACHE_MAX_CARDS,
+    }
@@ -0,0 +1,106 @@
+"""
+Conditional GET (ETag / Last-Modified) for the per-user HTML pages.
+
+A user's pages only change when one of their entries or preferences is
+written, when their local day rolls over (streaks, "today"), or when the
+application is redeployed. Every entry write already touches the user's
+UserStats row through the apply_* functions, and preference and profile
+writes (PATCH /users/me) call touch_user_stats(), so UserStats.updated_at
+is a per-user "last write" marker. The ETag also covers every user field
+the pages render. Validators are built from it and the cached User, so a request
+that can be answered with 304 Not Modified reads one stats row and never
+queries the entry table or renders a template.
+"""
+
+import hashlib
+import os
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from fastapi import Request
+from fastapi.responses import Response
+from app.models import User, UserStats
+from app.timezone_utils import UserClock
+
+# Part of every validator so a deploy (new templates) invalidates cached pages.
+# Defaults to the process start time; set APP_VERSION to share validators
+# between workers and across restarts of the same release.
+APP_STARTED_AT = datetime.now(timezone.utc).replace(microsecond=0)
+APP_VERSION = os.getenv("APP_VERSION") or APP_STARTED_AT.isoformat()
+
+
+def user_page_validators(user: User, stats: UserStats, clock: UserClock, page: str) -> tuple[str, datetime | None]:
+    """
+    ETag and Last-Modified for one of a user's pages.
+
+    Args:
+        user: The authenticated (cached) user
+        stats: The user's statistics row, whose updated_at marks the last write
+        clock: The request's UserClock (zone and local today)
+        page: Page identifier, e.g. the request path
+
+    Returns:
+        tuple: (etag, last_modified) with last_modified as an aware UTC datetime,
+        or None while the last change is still within the current second
+    """
+    last_write = stats.updated_at.replace(tzinfo=timezone.utc)
+    fingerprint = "|".join([
+        APP_VERSION,
+        page,
+        str(user.id),
+        user.email,
+        user.display_name or "",
+        str(user.is_verified),
+        getattr(user, 'entry_sort_preference', 'newest_first'),
+        clock.timezone_name,
+        clock.today.isoformat(),
+        last_write.isoformat(),
+    ])
+    etag = 'W/"' + hashlib.sha1(fingerprint.encode()).hexdigest()[:24] + '"'
+
+    # The page also changes when the user's day starts and on redeploy
+    day_start = clock.date_range(clock.today)[0]
+    last_modified = max(last_write, day_start, APP_STARTED_AT).replace(microsecond=0)
+    # HTTP dates have whole seconds, so a Last-Modified in the current second
+    # would also match a write later in that second; the ETag covers it until then
+    if last_modified >= datetime.now(timezone.utc).replace(microsecond=0):
+        return etag, None
+    return etag, last_modified
+
+
+def is_not_modified(request: Request, etag: str, last_modified: datetime | None) -> bool:
+    """
+    Whether the client's cached copy is still current.
+
+    If-None-Match takes precedence over If-Modified-Since (RFC 9110).
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        candidates = [tag.strip() for tag in if_none_match.split(",")]
+        # Weak comparison: W/"x" and "x" match
+        opaque = etag.removeprefix("W/")
+        return "*" in candidates or any(tag.removeprefix("W/") == opaque for tag in candidates)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return last_modified <= since
+    return False
+
+
+def set_validators(response: Response, etag: str, last_modified: datetime | None) -> Response:
+    """Attach the validators; private/no-cache makes browsers revalidate on every navigation."""
+    response.headers["ETag"] = etag
+    if last_modified is not None:
+        response.headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def not_modified_response(etag: str, last_modified: datetime | None) -> Response:
+    """Empty 304 response carrying the current validators."""
+    return set_validators(Response(status_code=304), etag, last_modified)
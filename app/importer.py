@@ -0,0 +1,348 @@
+"""
+Bulk import of entries from CSV or NDJSON.
+
+Used to migrate users in from other journals without replaying POST /add
+one form at a time. Rows are parsed as a stream, validated with the same
+server-side rules as the entry form, deduplicated against the user's
+existing entries and inserted with executemany in chunked transactions.
+
+CSV files may use the export headers (Date, Success_1, Overall_Rating, ...)
+or the Entry field names, so an export can be imported back as-is.
+
+Run ``python -m app.importer FILE --email user@example.com`` to import from
+the command line.
+"""
+
+import argparse
+import asyncio
+import csv
+import io
+import json
+from datetime import date, datetime, timezone
+from typing import IO, Iterator, Optional
+from sqlalchemy import distinct, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import Entry, User
+from app.export import EXPORT_COLUMNS
+from app.stats import rebuild_user_stats
+from app.cache import notify_entries_changed
+from app.timezone_utils import UserClock
+from app.validation import validate_daily_entry_server
+
+# Rows inserted per executemany call and per transaction
+IMPORT_BATCH_SIZE = 1000
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+TEXT_FIELDS = [
+    "title",
+    "success_1", "success_2", "success_3",
+    "gratitude_1", "gratitude_2", "gratitude_3",
+    "anxiety_1", "anxiety_2", "anxiety_3",
+    "journal",
+]
+
+# Entry field -> export header, for naming a bad column in row errors
+EXPORT_HEADERS = {attr: header for header, attr in EXPORT_COLUMNS}
+
+# Accepted input keys (export headers and Entry field names, case-insensitive) -> Entry field
+FIELD_ALIASES = {
+    **{header.lower(): attr for header, attr in EXPORT_COLUMNS},
+    **{attr: attr for _, attr in EXPORT_COLUMNS},
+}
+
+
+def detect_format(filename: str | None, content_type: str | None = None) -> str:
+    """Guess the import format from a filename or content type, defaulting to CSV."""
+    name = (filename or "").lower()
+    if name.endswith((".ndjson", ".jsonl")) or (content_type or "").startswith(("application/x-ndjson", "application/jsonl")):
+        return "ndjson"
+    return "csv"
+
+
+def iter_rows(stream: IO[bytes], fmt: str) -> Iterator[tuple[int, dict | None, str | None]]:
+    """
+    Parse an uploaded file one row at a time.
+
+    Args:
+        stream: Binary file object
+        fmt: 'csv' or 'ndjson'
+
+    Yields:
+        tuple: (row_number, fields, parse_error) with keys mapped to Entry fields.
+        A file that is not UTF-8 text or not valid CSV ends with one error for
+        the first row that could not be read.
+    """
+    text_stream = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    row_number = 0
+
+    try:
+        if fmt == "ndjson":
+            for row_number, line in enumerate(text_stream, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield row_number, None, f"Invalid JSON: {e.msg}"
+                    continue
+                if not isinstance(record, dict):
+                    yield row_number, None, "Each line must be a JSON object"
+                    continue
+                yield row_number, _normalize_keys(record), None
+        else:
+            # Row numbers count the header as row 1 so they match spreadsheet line numbers
+            for row_number, record in enumerate(csv.DictReader(text_stream), start=2):
+                yield row_number, _normalize_keys(record), None
+    except UnicodeDecodeError:
+        # Decoding reads ahead, so a few rows before this one may be unread too
+        yield row_number + 1, None, "File is not UTF-8 text; the rest of the file was not read"
+    except csv.Error as e:
+        yield row_number + 1, None, f"Invalid CSV: {e}; the rest of the file was not read"
+
+
+def _normalize_keys(record: dict) -> dict:
+    """Map input keys onto Entry fields, dropping unknown columns."""
+    fields = {}
+    for key, value in record.items():
+        attr = FIELD_ALIASES.get(str(key or "").strip().lower())
+        if attr:
+            fields[attr] = value
+    return fields
+
+
+def _parse_timestamp(value) -> Optional[datetime]:
+    """Parse an ISO 8601 timestamp (as written by the export) into naive UTC."""
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _parse_bool(value) -> bool:
+    """Interpret a CSV/JSON boolean."""
+    if isinstance(value, bool):
+        return value
+    return str(value or "").strip().lower() in ("1", "true", "yes", "y")
+
+
+def build_entry_row(user_id: str, clock: UserClock, fields: dict) -> tuple[dict | None, list[dict]]:
+    """
+    Validate one parsed row and build the Entry values to insert.
+
+    Args:
+        user_id: Owner of the imported entries
+        clock: The owner's UserClock (local day start used for created_at)
+        fields: Row keyed by Entry field names
+
+    Returns:
+        tuple: (values, errors) where values is None if the row is invalid
+    """
+    form_data = {
+        field: "" if fields.get(field) is None else str(fields.get(field))
+        for field in TEXT_FIELDS
+    }
+    form_data["score"] = fields.get("score")
+    errors = [
+        {"field": error.field, "message": error.message}
+        for error in validate_daily_entry_server(form_data)
+    ]
+
+    if form_data["score"] in (None, ""):
+        errors.append({"field": "score", "message": "Overall rating is required"})
+
+    entry_date = None
+    try:
+        entry_date = date.fromisoformat(str(fields.get("entry_date") or "").strip())
+    except ValueError:
+        errors.append({"field": "entry_date", "message": "Date must be in YYYY-MM-DD format"})
+
+    timestamps = {}
+    for field in ("created_at", "updated_at", "archived_at"):
+        try:
+            timestamps[field] = _parse_timestamp(fields.get(field))
+        except ValueError:
+            errors.append({"field": field, "message": f"{EXPORT_HEADERS[field]} must be an ISO 8601 timestamp"})
+
+    if errors:
+        return None, errors
+
+    created_at, updated_at, archived_at = timestamps["created_at"], timestamps["updated_at"], timestamps["archived_at"]
+    if created_at is None:
+        # Start of the user's local day, matching entries created through the form
+        created_at = clock.date_range(entry_date)[0].replace(tzinfo=None)
+    is_archived = _parse_bool(fields.get("is_archived"))
+
+    values = {
+        field: (form_data[field].strip() or None) for field in TEXT_FIELDS
+    }
+    values.update(
+        user_id=user_id,
+        entry_date=entry_date,
+        score=int(form_data["score"]),
+        created_at=created_at,
+        updated_at=updated_at or created_at,
+        is_archived=is_archived,
+        archived_at=(archived_at or datetime.utcnow()) if is_archived else None,
+        archived_reason=(fields.get("archived_reason") or None) if is_archived else None,
+    )
+    return values, []
+
+
+async def _active_entry_dates(db: AsyncSession, user_id: str) -> set[date]:
+    """Dates on which the user has an active entry."""
+    result = await db.execute(
+        select(distinct(Entry.entry_date)).where(Entry.user_id == user_id, Entry.is_archived == False)
+    )
+    return set(result.scalars().all())
+
+
+def _archived_entry_key(entry_date: date, created_at: datetime) -> tuple[date, datetime]:
+    """Identity of an archived entry across export and import (the export drops microseconds)."""
+    return entry_date, created_at.replace(microsecond=0)
+
+
+async def _archived_entry_keys(db: AsyncSession, user_id: str) -> set[tuple[date, datetime]]:
+    """Keys of the user's archived entries, see _archived_entry_key."""
+    result = await db.execute(
+        select(Entry.entry_date, Entry.created_at).where(Entry.user_id == user_id, Entry.is_archived == True)
+    )
+    return {_archived_entry_key(entry_date, created_at) for entry_date, created_at in result.all()}
+
+
+async def _insert_batch(db: AsyncSession, user_id: str, batch: list[dict]) -> int:
+    """
+    Insert one batch with executemany and refresh the user's statistics in the same transaction.
+
+    An entry added through POST /add while the import runs can take a date
+    the batch also has; the unique index rejects the batch, and it is
+    retried without the rows whose date now has an active entry.
+
+    Returns:
+        int: Rows inserted (the rest were duplicates)
+    """
+    while batch:
+        try:
+            await db.execute(insert(Entry), batch)
+            break
+        except IntegrityError:
+            await db.rollback()
+            taken = await _active_entry_dates(db, user_id)
+            remaining = [values for values in batch if values["is_archived"] or values["entry_date"] not in taken]
+            if len(remaining) == len(batch):
+                # Not a one-entry-per-day conflict
+                raise
+            batch = remaining
+
+    # One aggregate over the indexed entry columns per batch keeps UserStats exact
+    await rebuild_user_stats(db, user_id)
+    await db.commit()
+    return len(batch)
+
+
+async def import_entries(
+    db: AsyncSession,
+    user: User,
+    stream: IO[bytes],
+    fmt: str = "csv",
+    batch_size: int = IMPORT_BATCH_SIZE
+) -> dict:
+    """
+    Import entries for a user from a CSV or NDJSON stream.
+
+    Active rows whose date already has an active entry (existing or earlier
+    in the file) are skipped, as are archived rows matching an archived
+    entry's date and creation time, so an export imports back as-is and a
+    repeated import adds nothing. Each batch commits on its own, so a
+    failure part-way keeps the batches already imported.
+
+    Args:
+        db: Async database session
+        user: Owner of the imported entries
+        stream: Binary file object to read
+        fmt: 'csv' or 'ndjson'
+        batch_size: Rows per executemany call and transaction
+
+    Returns:
+        dict: {"imported": int, "duplicates": int, "errors": [{"row", "errors"}]}
+    """
+    # Read from the user once: a batch rollback expires a session-bound instance
+    user_id, clock = str(user.id), UserClock(user)
+    # One active entry per day is what the unique index enforces; archived
+    # entries can share a date with anything
+    active_dates = await _active_entry_dates(db, user_id)
+    archived_keys = await _archived_entry_keys(db, user_id)
+
+    report = {"imported": 0, "duplicates": 0, "errors": []}
+    batch = []
+
+    try:
+        for row_number, fields, parse_error in iter_rows(stream, fmt):
+            if parse_error:
+                report["errors"].append({"row": row_number, "errors": [{"field": None, "message": parse_error}]})
+                continue
+
+            values, errors = build_entry_row(user_id, clock, fields)
+            if errors:
+                report["errors"].append({"row": row_number, "errors": errors})
+                continue
+
+            if values["is_archived"]:
+                seen, key = archived_keys, _archived_entry_key(values["entry_date"], values["created_at"])
+            else:
+                seen, key = active_dates, values["entry_date"]
+            if key in seen:
+                report["duplicates"] += 1
+                continue
+            seen.add(key)
+
+            batch.append(values)
+            if len(batch) >= batch_size:
+                inserted = await _insert_batch(db, user_id, batch)
+                report["imported"] += inserted
+                report["duplicates"] += len(batch) - inserted
+                batch = []
+
+        if batch:
+            inserted = await _insert_batch(db, user_id, batch)
+            report["imported"] += inserted
+            report["duplicates"] += len(batch) - inserted
+    finally:
+        # Committed batches stay imported even if a later one fails
+        if report["imported"]:
+            notify_entries_changed(user_id)
+
+    print(f"Imported {report['imported']} entries for user {user_id} "
+          f"({report['duplicates']} duplicates, {len(report['errors'])} rejected rows)")
+    return report
+
+
+async def import_file(path: str, email: str, fmt: str | None = None) -> dict:
+    """Import a file from disk for the user with the given email."""
+    from app.database import async_session_maker, init_db
+
+    await init_db()
+    async with async_session_maker() as db:
+        result = await db.execute(select(User).where(User.email == email))
+        user = result.scalars().first()
+        if user is None:
+            raise SystemExit(f"No user with email {email}")
+
+        with open(path, "rb") as stream:
+            return await import_entries(db, user, stream, fmt or detect_format(path))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import entries from CSV or NDJSON")
+    parser.add_argument("path", help="File to import")
+    parser.add_argument("--email", required=True, help="Email of the user to import entries for")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, help="Input format (default: from file extension)")
+    args = parser.parse_args()
+
+    report = asyncio.run(import_file(args.path, args.email, args.format))
+    for rejected in report["errors"]:
+        messages = "; ".join(error["message"] for error in rejected["errors"])
+        print(f"Row {rejected['row']}: {messages}")
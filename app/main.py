@@ -1,15 +1,42 @@
 from datetime import date, datetime
 from typing import Optional
-from fastapi import FastAPI, Request, Depends, Form, HTTPException
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi import FastAPI, Request, Depends, Form, HTTPException, UploadFile, File
+from fastapi.responses import HTMLResponse, RedirectResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
-from sqlmodel import Session
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from pathlib import Path
-from app.database import engine, init_db, get_session
+from app.database import engine, init_db, get_async_session
 from app.models import Entry, EntryUpdate, EntryRead, User, UserCreate, UserRead, UserUpdate, ArchiveRequest
-from app.timezone_utils import get_user_local_date, format_user_timestamp, get_user_date_range
+from app.timezone_utils import get_request_clock, format_user_timestamp, timezone_catalogue
 from app.auth import auth_backend, fastapi_users, current_active_user, current_verified_user, google_oauth_router, github_oauth_router
-from fastapi.templating import Jinja2Templates
+from app.cache import get_cached_user, cache_user, invalidate_user, notify_entries_changed
+from app.analytics import get_mood_trends, get_weekday_distribution, get_score_histogram
+from app.search import search_entries
+from app.http_cache import user_page_validators, is_not_modified, not_modified_response, set_validators
+from app.fragment_cache import entry_card
+from app.export import stream_entries_csv, export_filename
+from app.importer import import_entries, detect_format, IMPORT_FORMATS
+from app.stats import (
+    get_user_stats,
+    apply_entry_added,
+    apply_entry_edited,
+    touch_user_stats,
+    apply_entry_archived,
+    apply_entry_unarchived,
+    apply_entry_deleted
+)
+from app.entry_repository import (
+    get_user_entry,
+    get_dashboard_entries,
+    list_active_entries,
+    list_archived_entries_page,
+    list_archive_reason_facets,
+    list_month_facets,
+    get_active_entry_on_date,
+    is_active_entry_date_conflict
+)
+from app.templating import templates, precompile_templates
 
 # Import error handling system
 from app.errors import (
@@ -33,7 +60,8 @@ app.add_exception_handler(ValidationError, validation_error_handler)
 app.add_exception_handler(NetworkError, network_error_handler)
 app.add_exception_handler(Exception, general_exception_handler)
 app.mount("/static", StaticFiles(directory=Path(__file__).parent / "static"), name="static")
-templates = Jinja2Templates(directory=Path(__file__).parent.parent / "templates")
+# Cached entry card rendering: {{ entry_card(entry, action_type) }} (needs `clock` in the context)
+templates.env.globals["entry_card"] = entry_card
 
 # Include authentication routes
 app.include_router(
@@ -75,6 +103,7 @@ app.include_router(
 @app.on_event("startup")
 async def on_startup() -> None:
     await init_db()
+    precompile_templates()
 
 
 
@@ -122,6 +151,11 @@ async def get_current_user_safe(request: Request):
             
             print(f"Token user ID: {user_id_str}")
             
+            # Serve from the in-process user cache when possible
+            cached_user = get_cached_user(user_id_str)
+            if cached_user is not None:
+                return cached_user
+            
             # Convert string to UUID
             user_id = uuid.UUID(user_id_str)
             
@@ -134,6 +168,7 @@ async def get_current_user_safe(request: Request):
                     user = await user_db.get(user_id)
                     if user and user.is_active:
                         print(f"Found user: {user.email}, verified: {user.is_verified}")
+                        cache_user(user)
                         return user
                     else:
                         print(f"User not found or inactive: {user_id}")
@@ -147,8 +182,24 @@ async def get_current_user_safe(request: Request):
         print(f"Auth error: {type(e).__name__}: {e}")
         return None
 
+async def get_verified_user_or_401(request: Request):
+    """
+    Authenticated, verified user for HTMX, JSON and file endpoints.
+    
+    Page routes redirect to /login or /verify instead; these endpoints answer
+    401 when there is no session and 403 when the email is not verified.
+    """
+    user = await get_current_user_safe(request)
+    if not user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    
+    if not user.is_verified:
+        raise HTTPException(status_code=403, detail="User not verified")
+    
+    return user
+
 @app.get("/", response_class=HTMLResponse)
-async def index(request: Request, db: Session = Depends(get_session)):
+async def index(request: Request, db: AsyncSession = Depends(get_async_session)):
     user = await get_current_user_safe(request)
     if not user:
         print("No authenticated user, redirecting to login")
@@ -158,18 +209,17 @@ async def index(request: Request, db: Session = Depends(get_session)):
     # For now, let's allow unverified users to access the dashboard
     # Dashboard always shows most recent active entries (newest first) regardless of user preference
     # Exclude archived entries from dashboard view
-    entries = db.query(Entry).filter(
-        Entry.user_id == str(user.id),
-        Entry.is_archived == False
-    ).order_by(Entry.entry_date.desc()).limit(3).all()
-    
-    # Check if user can create entry today (one-entry-per-day constraint)
-    db_user = db.query(User).filter(User.id == user.id).first()
-    can_create_today = can_create_entry_today(db_user, db) if db_user else False
-    existing_entry_today = None
-    if not can_create_today and db_user:
-        today_local = get_user_local_date(db_user)
-        existing_entry_today = get_entry_for_date(db_user, today_local, db)
+    # Today's entry (one-entry-per-day constraint) comes from the same query.
+    # The user is served from the cache, which timezone updates invalidate.
+    clock = get_request_clock(request, user)
+    today_local = clock.today
+    # The streaks come from the stats row, read in the same query
+    entries, existing_entry_today, streaks = await get_dashboard_entries(db, str(user.id), today_local, limit=3)
+    if streaks is None:
+        # No stats row yet: build it from the entry table once and read again
+        await get_user_stats(db, str(user.id))
+        entries, existing_entry_today, streaks = await get_dashboard_entries(db, str(user.id), today_local, limit=3)
+    can_create_today = existing_entry_today is None
     
     return templates.TemplateResponse("dashboard.html", {
         "request": request, 
@@ -177,7 +227,9 @@ async def index(request: Request, db: Session = Depends(get_session)):
         "user": user,
         "can_create_today": can_create_today,
         "existing_entry_today": existing_entry_today,
-        "format_user_timestamp": format_user_timestamp
+        "current_streak": streaks.current_streak(today_local),
+        "longest_streak": streaks.longest_streak,
+        "clock": clock
     })
 
 
@@ -190,8 +242,47 @@ def login_page(request: Request):
 def register_page(request: Request):
     return templates.TemplateResponse("auth/register.html", {"request": request})
 
+def build_entry_periods(facets: list[dict]) -> list[dict]:
+    """
+    Year/month section headers for the history page from the month facets.
+    
+    Sections carry only their header totals; each section's entry cards are
+    fetched from /entries/sections/{year}/{month} when it scrolls into view.
+    
+    Args:
+        facets: Rows from list_month_facets in display order
+    
+    Returns:
+        list: Period dictionaries for templates/partials/entry_sections.html
+    """
+    import calendar
+    
+    return [
+        {
+            'year': str(facet['year']),
+            'month': f"{facet['month']:02d}",
+            'month_name': calendar.month_name[facet['month']],
+            'entry_count': facet['count'],
+            'avg_score': facet['avg_score']
+        }
+        for facet in facets
+    ]
+
+
+def parse_period_filter(year: Optional[str], month: Optional[str]) -> tuple[Optional[int], Optional[int]]:
+    """Year and month from the history filter; empty values mean no filter."""
+    try:
+        year_filter = int(year) if year else None
+        month_filter = int(month) if month else None
+    except ValueError:
+        raise HTTPException(status_code=422, detail="Invalid year or month")
+    if (year_filter is not None and not 1 <= year_filter <= 9999) or (month_filter is not None and not 1 <= month_filter <= 12):
+        raise HTTPException(status_code=422, detail="Invalid year or month")
+    return year_filter, month_filter
+
+
 @app.get("/entries", response_class=HTMLResponse)
-async def entries_page(request: Request, db: Session = Depends(get_session)):
+async def entries_page(request: Request, db: AsyncSession = Depends(get_async_session)):
     user = await get_current_user_safe(request)
     if not user:
         return RedirectResponse("/login", status_code=303)
@@ -199,86 +290,112 @@ async def entries_page(request: Request, db: Session = Depends(get_session)):
     if not user.is_verified:
         return RedirectResponse("/verify?email=" + user.email, status_code=303)
     
-    # Get all entries for the user with sort preference
     # Use user's sort preference, fallback to 'newest_first' for existing users
     sort_preference = getattr(user, 'entry_sort_preference', 'newest_first')
+    user_id = str(user.id)
     
-    # Exclude archived entries from main history view
-    if sort_preference == 'oldest_first':
-        entries = db.query(Entry).filter(
-            Entry.user_id == str(user.id),
-            Entry.is_archived == False
-        ).order_by(Entry.entry_date.asc()).all()
-    else:
-        entries = db.query(Entry).filter(
-            Entry.user_id == str(user.id),
-            Entry.is_archived == False
-        ).order_by(Entry.entry_date.desc()).all()
-    
-    # Calculate statistics
-    total_entries = len(entries)
-    avg_score = sum(e.score for e in entries) / total_entries if entries else 0
-    
-    # Group entries by year and month
-    from collections import defaultdict
-    from datetime import datetime
-    import calendar
+    # Header statistics and the streak are a single-row read of the maintained stats table,
+    # which also decides whether the client's copy of the page is still current
+    stats = await get_user_stats(db, user_id)
+    clock = get_request_clock(request, user)
+    etag, last_modified = user_page_validators(user, stats, clock, request.url.path)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified_response(etag, last_modified)
     
-    entries_by_period = defaultdict(list)
-    years = set()
+    # Only month headers are rendered; entry cards load per section as it is revealed,
+    # so the page costs the same however long the history is
+    # Exclude archived entries from main history view
+    facets = await list_month_facets(db, user_id, sort_preference)
+    years = list(dict.fromkeys(facet["year"] for facet in facets))
     
-    for entry in entries:
-        year = entry.entry_date.year
-        month = entry.entry_date.month
-        years.add(year)
-        
-        # Note: search content will be generated in template for filtering
-        
-        period_key = f"{year}-{month:02d}"
-        entries_by_period[period_key].append(entry)
-    
-    # Convert to list with metadata
-    periods_list = []
-    for period_key in sorted(entries_by_period.keys(), reverse=True):
-        year, month = period_key.split('-')
-        period_entries = entries_by_period[period_key]
-        
-        # Sort entries within each period according to user preference
-        reverse_sort = sort_preference != 'oldest_first'
-        periods_list.append({
-            'year': year,
-            'month': month,
-            'month_name': calendar.month_name[int(month)],
-            'entries': sorted(period_entries, key=lambda x: x.entry_date, reverse=reverse_sort),
-            'avg_score': sum(e.score for e in period_entries) / len(period_entries)
-        })
-    
-    # Calculate unique months and streak (simplified)
-    unique_months = len(set((e.entry_date.year, e.entry_date.month) for e in entries))
-    
-    # Simple streak calculation (consecutive days with entries)
-    streak_days = 0
-    if entries:
-        from datetime import date, timedelta
-        current_date = date.today()
-        entry_dates = set(e.entry_date for e in entries)
-        
-        while current_date in entry_dates:
-            streak_days += 1
-            current_date -= timedelta(days=1)
+    streak_days = stats.current_streak(clock.today)
     
-    return templates.TemplateResponse("entries.html", {
+    response = templates.TemplateResponse("entries.html", {
         "request": request, 
         "user": user,
-        "entries_by_period": periods_list,
-        "total_entries": total_entries,
-        "avg_score": avg_score,
-        "format_user_timestamp": format_user_timestamp,
-        "unique_months": unique_months,
+        "entries_by_period": build_entry_periods(facets),
+        "total_entries": stats.entry_count,
+        "avg_score": stats.avg_score,
+        "unique_months": stats.month_count,
         "streak_days": streak_days,
-        "years": sorted(years, reverse=True),
+        "years": years,
         "sort_preference": sort_preference
     })
+    return set_validators(response, etag, last_modified)
+
+
+@app.get("/entries/facets")
+async def entries_facets(request: Request, db: AsyncSession = Depends(get_async_session)):
+    """Entry count and average rating per month of active entries, in the user's sort order."""
+    user = await get_verified_user_or_401(request)
+    sort_preference = getattr(user, 'entry_sort_preference', 'newest_first')
+    return {"facets": await list_month_facets(db, str(user.id), sort_preference)}
+
+
+@app.get("/entries/sections", response_class=HTMLResponse)
+async def entries_sections(
+    request: Request,
+    year: Optional[str] = None,
+    month: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_session)
+):
+    """HTMX partial: history section headers matching the year/month filter."""
+    user = await get_verified_user_or_401(request)
+    year_filter, month_filter = parse_period_filter(year, month)
+    
+    sort_preference = getattr(user, 'entry_sort_preference', 'newest_first')
+    facets = await list_month_facets(db, str(user.id), sort_preference, year=year_filter, month=month_filter)
+    
+    return templates.TemplateResponse("partials/entry_sections.html", {
+        "request": request,
+        "entries_by_period": build_entry_periods(facets)
+    })
+
+
+@app.get("/entries/sections/{year}/{month}", response_class=HTMLResponse)
+async def entries_section_cards(request: Request, year: int, month: int, db: AsyncSession = Depends(get_async_session)):
+    """HTMX partial: the entry cards of one history section."""
+    user = await get_verified_user_or_401(request)
+    if not 1 <= year <= 9999 or not 1 <= month <= 12:
+        raise HTTPException(status_code=422, detail="Invalid year or month")
+    
+    sort_preference = getattr(user, 'entry_sort_preference', 'newest_first')
+    # One active entry per day, so a month never has more than 31
+    entries = await list_active_entries(
+        db, str(user.id), sort_preference, limit=31, year=year, month=month
+    )
+    
+    return templates.TemplateResponse("partials/entry_month_cards.html", {
+        "request": request,
+        "user": user,
+        "entries": entries,
+        "clock": get_request_clock(request, user)
+    })
+
+@app.get("/entries/search", response_class=HTMLResponse)
+async def entries_search(
+    request: Request,
+    q: str = "",
+    page: int = 1,
+    archived: bool = False,
+    db: AsyncSession = Depends(get_async_session)
+):
+    """HTMX partial: ranked full-text search over the user's active or archived entries."""
+    user = await get_verified_user_or_401(request)
+    
+    query = q.strip()
+    results, has_more = await search_entries(db, str(user.id), query, archived=archived, page=page)
+    
+    return templates.TemplateResponse("partials/search_results.html", {
+        "request": request,
+        "user": user,
+        "query": query,
+        "page": page,
+        "archived": archived,
+        "results": results,
+        "has_more": has_more,
+        "clock": get_request_clock(request, user)
+    })
 
 @app.get("/analytics", response_class=HTMLResponse)
 async def analytics_page(request: Request):
@@ -291,6 +408,25 @@ async def analytics_page(request: Request):
     
     return templates.TemplateResponse("analytics.html", {"request": request, "user": user})
 
+@app.get("/analytics/mood-trends")
+async def analytics_mood_trends(request: Request, days: int = 30, db: AsyncSession = Depends(get_async_session)):
+    """Daily average rating for the last `days` days (Chart.js line data)."""
+    user = await get_verified_user_or_401(request)
+    days = max(1, min(days, 366))
+    return await get_mood_trends(db, str(user.id), get_request_clock(request, user).today, days)
+
+@app.get("/analytics/weekday-distribution")
+async def analytics_weekday_distribution(request: Request, db: AsyncSession = Depends(get_async_session)):
+    """Entry count and average rating per weekday (Chart.js bar data)."""
+    user = await get_verified_user_or_401(request)
+    return await get_weekday_distribution(db, str(user.id))
+
+@app.get("/analytics/score-histogram")
+async def analytics_score_histogram(request: Request, db: AsyncSession = Depends(get_async_session)):
+    """Number of entries at each rating (Chart.js bar data)."""
+    user = await get_verified_user_or_401(request)
+    return await get_score_histogram(db, str(user.id))
+
 @app.get("/settings", response_class=HTMLResponse)
 async def settings_page(request: Request):
     user = await get_current_user_safe(request)
@@ -300,15 +436,26 @@ async def settings_page(request: Request):
     if not user.is_verified:
         return RedirectResponse("/verify?email=" + user.email, status_code=303)
     
-    # Import here to avoid circular import
-    # Simplified timezone handling - no manual override needed
+    # Simplified timezone handling - no manual override needed; the label
+    # (with its current UTC offset) comes from the precomputed catalogue
+    clock = get_request_clock(request, user)
     
     return templates.TemplateResponse("settings.html", {
         "request": request, 
-        "user": user
+        "user": user,
+        "effective_timezone": clock.timezone_name,
+        "timezone_label": timezone_catalogue.label(clock.timezone_name) or clock.timezone_name
     })
 
 
+@app.get("/api/timezones")
+async def list_timezones(q: str = "", limit: int = 20):
+    """Timezones with current UTC offset labels: prefix search over every IANA zone, or the common zones when q is empty."""
+    if not q.strip():
+        return {"timezones": timezone_catalogue.common()}
+    return {"timezones": timezone_catalogue.search(q, limit=max(1, min(limit, 100)))}
+
+
 @app.get("/debug-auth")
 async def debug_auth(request: Request):
     """Debug endpoint to check authentication status"""
@@ -397,6 +544,7 @@ async def verify_code(request: Request):
             
             session.add(user)
             await session.commit()
+            invalidate_user(user.id)
             
             return {"message": "Email verified successfully"}
             
@@ -436,6 +584,7 @@ async def resend_verification_code(request: Request):
             
             session.add(user)
             await session.commit()
+            invalidate_user(user.id)
             
             # Send email
             from app.auth import fastmail
@@ -482,7 +631,7 @@ async def logout(request: Request):
 
 
 # One-entry-per-day constraint helper functions
-def get_entry_for_date(user: User, target_date: date, db: Session) -> Entry | None:
+async def get_entry_for_date(user: User, target_date: date, db: AsyncSession) -> Entry | None:
     """
     Get existing entry for user on specific date.
     
@@ -494,36 +643,9 @@ def get_entry_for_date(user: User, target_date: date, db: Session) -> Entry | No
     Returns:
         Entry if exists, None otherwise
     """
-    # Get UTC date range for the target date in user's timezone
-    start_utc, end_utc = get_user_date_range(user, target_date)
-    
-    # Query for active (non-archived) entries within this date range
-    # Archived entries don't count toward one-entry-per-day constraint
-    existing_entry = db.query(Entry).filter(
-        Entry.user_id == str(user.id),
-        Entry.created_at >= start_utc,
-        Entry.created_at <= end_utc,
-        Entry.is_archived == False
-    ).first()
-    
-    return existing_entry
-
-
-def can_create_entry_today(user: User, db: Session) -> bool:
-    """
-    Check if user can create an entry for today.
-    Implements simple one-entry-per-day constraint using auto-detected timezone.
-    
-    Args:
-        user: User model instance
-        db: Database session
-        
-    Returns:
-        bool: True if user can create entry, False if already exists
-    """
-    today_local = get_user_local_date(user)  # Auto-detected timezone
-    existing_entry = get_entry_for_date(user, today_local, db)
-    return existing_entry is None
+    # entry_date stores the local date the entry was written on; archived
+    # entries don't count toward the one-entry-per-day constraint
+    return await get_active_entry_on_date(db, str(user.id), target_date)
 
 
 @app.post("/add")
@@ -541,7 +663,7 @@ async def add_entry(
     anxiety_3: str = Form(""),
     score: int = Form(...),
     journal: str = Form(""),
-    db: Session = Depends(get_session),
+    db: AsyncSession = Depends(get_async_session),
 ):
     # Get the current user using our safe method
     user = await get_current_user_safe(request)
@@ -554,32 +676,13 @@ async def add_entry(
     
     print(f"Adding entry for user: {user.email}, verified: {user.is_verified}")
     
-    # Refresh user from sync database to get latest timezone settings
-    # This ensures we have the most up-to-date timezone data for date calculation
-    db_user = db.query(User).filter(User.id == user.id).first()
-    if not db_user:
-        return RedirectResponse("/login", status_code=303)
-    
-    print(f"Refreshed user timezone data: detected={db_user.last_detected_timezone}, legacy={db_user.timezone}")
-    
-    # Check one-entry-per-day constraint
-    if not can_create_entry_today(db_user, db):
-        today_local = get_user_local_date(db_user)
-        existing_entry = get_entry_for_date(db_user, today_local, db)
-        
-        # Return error with link to existing entry
-        if request.headers.get("HX-Request"):
-            return HTMLResponse(
-                f'<div class="error-message">You already created an entry for {today_local.strftime("%B %d, %Y")}. '
-                f'<a href="/entries/{existing_entry.id}" class="text-blue-600 hover:text-blue-800">View/Edit Entry</a></div>'
-            )
-        else:
-            # For regular form submission, redirect to existing entry
-            return RedirectResponse(f"/entries/{existing_entry.id}", status_code=303)
+    # The cached user is invalidated whenever its timezone changes, so its
+    # local date is current
+    today_local = get_request_clock(request, user).today
     
     entry = Entry(
         user_id=str(user.id),
-        entry_date=get_user_local_date(db_user),  # Use refreshed user object
+        entry_date=today_local,
         title=title if title.strip() else None,
         success_1=success_1,
         success_2=success_2 if success_2.strip() else None,
@@ -594,7 +697,34 @@ async def add_entry(
         journal=journal if journal.strip() else None
     )
     db.add(entry)
-    db.commit()
+    try:
+        # The insert happens at this flush; the partial unique index on
+        # (user_id, entry_date) for active entries enforces one entry per day,
+        # including between concurrent requests
+        await apply_entry_added(db, entry)
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        if not is_active_entry_date_conflict(e):
+            raise
+        existing_entry = await get_entry_for_date(user, today_local, db)
+        if existing_entry is None:
+            # The conflicting entry was archived or deleted since our insert
+            message = "Today's entry changed while saving. Please submit again."
+            if request.headers.get("HX-Request"):
+                return HTMLResponse(f'<div class="error-message">{message}</div>')
+            raise HTTPException(status_code=409, detail=message)
+        
+        # Return error with link to existing entry
+        if request.headers.get("HX-Request"):
+            return HTMLResponse(
+                f'<div class="error-message">You already created an entry for {today_local.strftime("%B %d, %Y")}. '
+                f'<a href="/entries/{existing_entry.id}" class="text-blue-600 hover:text-blue-800">View/Edit Entry</a></div>'
+            )
+        else:
+            # For regular form submission, redirect to existing entry
+            return RedirectResponse(f"/entries/{existing_entry.id}", status_code=303)
+    notify_entries_changed(user.id)
     
     # Show success message for HTMX requests
     if request.headers.get("HX-Request"):
@@ -618,19 +748,14 @@ async def update_entry(
     anxiety_3: str = Form(""),
     score: int = Form(...),
     journal: str = Form(""),
-    db: Session = Depends(get_session),
+    db: AsyncSession = Depends(get_async_session),
 ):
     """Update an existing entry"""
     # Get the current user
-    user = await get_current_user_safe(request)
-    if not user:
-        raise HTTPException(status_code=401, detail="Not authenticated")
-    
-    if not user.is_verified:
-        raise HTTPException(status_code=403, detail="User not verified")
+    user = await get_verified_user_or_401(request)
     
     # Get the entry and verify ownership
-    entry = db.query(Entry).filter(Entry.id == entry_id, Entry.user_id == str(user.id)).first()
+    entry = await get_user_entry(db, str(user.id), entry_id)
     if not entry:
         raise HTTPException(status_code=404, detail="Entry not found")
     
@@ -654,12 +779,16 @@ async def update_entry(
     update_data["score"] = score
     
     # Apply updates
+    old_score = entry.score
     for field, value in update_data.items():
         setattr(entry, field, value)
     
+    # Always recorded: text-only edits must still change the user's last-write marker
+    await apply_entry_edited(db, entry, old_score)
+    
     # The updated_at field will be automatically set by the SQLAlchemy event listener
-    db.commit()
-    db.refresh(entry)
+    await db.commit()
+    notify_entries_changed(user.id)
     
     print(f"Entry {entry_id} updated successfully")
     return RedirectResponse("/entries", status_code=303)
@@ -668,16 +797,13 @@ async def update_entry(
 async def archive_entry(
     entry_id: int,
     request: Request,
-    db: Session = Depends(get_session),
+    db: AsyncSession = Depends(get_async_session),
     user: User = Depends(current_active_user)
 ):
     """Archive an entry (three-state system: Active → Archived → Deleted)"""
     try:
         # Get the entry
-        entry = db.query(Entry).filter(
-            Entry.id == entry_id,
-            Entry.user_id == str(user.id)
-        ).first()
+        entry = await get_user_entry(db, str(user.id), entry_id)
         
         if not entry:
             raise HTTPException(status_code=404, detail="Entry not found")
@@ -693,30 +819,29 @@ async def archive_entry(
         entry.is_archived = True
         entry.archived_at = datetime.utcnow()
         entry.archived_reason = archive_reason
+        await apply_entry_archived(db, entry)
         
-        db.commit()
+        await db.commit()
+        notify_entries_changed(user.id)
         print(f"Entry {entry_id} archived successfully")
         
         return {"status": "archived", "entry_id": entry_id}
         
     except Exception as e:
         print(f"Error archiving entry {entry_id}: {e}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Failed to archive entry")
 
 @app.post("/entries/{entry_id}/unarchive")
 async def unarchive_entry(
     entry_id: int,
-    db: Session = Depends(get_session),
+    db: AsyncSession = Depends(get_async_session),
     user: User = Depends(current_active_user)
 ):
     """Unarchive an entry (restore to active state)"""
     try:
         # Get the entry
-        entry = db.query(Entry).filter(
-            Entry.id == entry_id,
-            Entry.user_id == str(user.id)
-        ).first()
+        entry = await get_user_entry(db, str(user.id), entry_id)
         
         if not entry:
             raise HTTPException(status_code=404, detail="Entry not found")
@@ -728,19 +853,29 @@ async def unarchive_entry(
         entry.is_archived = False
         entry.archived_at = None
         entry.archived_reason = None
+        await apply_entry_unarchived(db, entry)
         
-        db.commit()
+        await db.commit()
+        notify_entries_changed(user.id)
         print(f"Entry {entry_id} unarchived successfully")
         
         return {"status": "unarchived", "entry_id": entry_id}
         
+    except IntegrityError as e:
+        await db.rollback()
+        if not is_active_entry_date_conflict(e):
+            raise
+        raise HTTPException(
+            status_code=409,
+            detail="Another active entry already exists for this date. Archive it before restoring this one."
+        )
     except Exception as e:
         print(f"Error unarchiving entry {entry_id}: {e}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Failed to unarchive entry")
 
 @app.get("/archive", response_class=HTMLResponse)
-async def archive_page(request: Request, db: Session = Depends(get_session)):
+async def archive_page(request: Request, db: AsyncSession = Depends(get_async_session)):
     """Archive page showing archived entries"""
     user = await get_current_user_safe(request)
     if not user:
@@ -752,36 +887,66 @@ async def archive_page(request: Request, db: Session = Depends(get_session)):
     # Get archived entries with user's sort preference
     sort_preference = getattr(user, 'entry_sort_preference', 'newest_first')
     
-    if sort_preference == 'oldest_first':
-        entries = db.query(Entry).filter(
-            Entry.user_id == str(user.id),
-            Entry.is_archived == True
-        ).order_by(Entry.archived_at.asc()).all()
-    else:
-        entries = db.query(Entry).filter(
-            Entry.user_id == str(user.id),
-            Entry.is_archived == True
-        ).order_by(Entry.archived_at.desc()).all()
-    
-    # Calculate statistics
-    total_archived = len(entries)
-    avg_score = sum(e.score for e in entries) / total_archived if entries else 0
-    
-    return templates.TemplateResponse("archive.html", {
+    # Header statistics are a single-row read of the maintained stats table,
+    # which also decides whether the client's copy of the page is still current
+    stats = await get_user_stats(db, str(user.id))
+    clock = get_request_clock(request, user)
+    etag, last_modified = user_page_validators(user, stats, clock, request.url.path)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified_response(etag, last_modified)
+    total_archived = stats.archived_count
+    avg_score = stats.archived_avg_score
+    
+    # Only the first page is rendered; further pages load via /archive/page
+    entries, next_cursor = await list_archived_entries_page(db, str(user.id), sort_preference)
+    reason_facets = await list_archive_reason_facets(db, str(user.id))
+    
+    response = templates.TemplateResponse("archive.html", {
         "request": request,
         "user": user,
         "entries": entries,
+        "next_cursor": next_cursor,
+        "reason_facets": reason_facets,
         "total_archived": total_archived,
         "avg_score": avg_score,
-        "format_user_timestamp": format_user_timestamp,
+        "clock": clock,
         "sort_preference": sort_preference
     })
+    return set_validators(response, etag, last_modified)
+
+
+@app.get("/archive/page", response_class=HTMLResponse)
+async def archive_next_page(
+    request: Request,
+    cursor: Optional[str] = None,
+    reason: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_session)
+):
+    """HTMX partial: a page of archived entries, optionally for one archive reason."""
+    user = await get_verified_user_or_401(request)
+    
+    sort_preference = getattr(user, 'entry_sort_preference', 'newest_first')
+    try:
+        entries, next_cursor = await list_archived_entries_page(
+            db, str(user.id), sort_preference, cursor=cursor, reason=reason or None
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    
+    return templates.TemplateResponse("partials/archive_entries.html", {
+        "request": request,
+        "user": user,
+        "entries": entries,
+        "next_cursor": next_cursor,
+        "reason": reason or "",
+        "clock": get_request_clock(request, user)
+    })
 
 @app.get("/entries/{entry_id}/view", response_class=HTMLResponse)
 async def view_entry(
     entry_id: int,
     request: Request,
-    db: Session = Depends(get_session)
+    db: AsyncSession = Depends(get_async_session)
 ):
     """View a specific entry in detail (read-only)"""
     # Get the current user
@@ -792,23 +957,30 @@ async def view_entry(
     if not user.is_verified:
         return RedirectResponse("/verify?email=" + user.email, status_code=303)
     
-    # Get the entry and verify ownership
-    entry = db.query(Entry).filter(Entry.id == entry_id, Entry.user_id == str(user.id)).first()
+    # Ownership first: a cached copy of a deleted or foreign entry is never current
+    entry = await get_user_entry(db, str(user.id), entry_id)
     if not entry:
         return RedirectResponse("/entries", status_code=303)
     
-    return templates.TemplateResponse("entry_detail.html", {
+    etag, last_modified = user_page_validators(
+        user, await get_user_stats(db, str(user.id)), get_request_clock(request, user), request.url.path
+    )
+    if is_not_modified(request, etag, last_modified):
+        return not_modified_response(etag, last_modified)
+    
+    response = templates.TemplateResponse("entry_detail.html", {
         "request": request,
         "entry": entry,
         "user": user,
         "format_user_timestamp": format_user_timestamp
     })
+    return set_validators(response, etag, last_modified)
 
 @app.get("/entries/{entry_id}", response_class=HTMLResponse)
 async def get_entry(
     entry_id: int,
     request: Request,
-    db: Session = Depends(get_session)
+    db: AsyncSession = Depends(get_async_session)
 ):
     """Get a specific entry for editing"""
     # Get the current user
@@ -819,45 +991,89 @@ async def get_entry(
     if not user.is_verified:
         return RedirectResponse("/verify?email=" + user.email, status_code=303)
     
-    # Get the entry and verify ownership
-    entry = db.query(Entry).filter(Entry.id == entry_id, Entry.user_id == str(user.id)).first()
+    # Ownership first: a cached copy of a deleted or foreign entry is never current
+    entry = await get_user_entry(db, str(user.id), entry_id)
     if not entry:
         raise HTTPException(status_code=404, detail="Entry not found")
     
-    return templates.TemplateResponse("edit_entry.html", {
+    etag, last_modified = user_page_validators(
+        user, await get_user_stats(db, str(user.id)), get_request_clock(request, user), request.url.path
+    )
+    if is_not_modified(request, etag, last_modified):
+        return not_modified_response(etag, last_modified)
+    
+    response = templates.TemplateResponse("edit_entry.html", {
         "request": request,
         "user": user,
         "entry": entry,
         "format_user_timestamp": format_user_timestamp
     })
+    return set_validators(response, etag, last_modified)
 
 
 @app.delete("/entries/{entry_id}")
 async def delete_entry(
     request: Request,
     entry_id: int,
-    db: Session = Depends(get_session)
+    db: AsyncSession = Depends(get_async_session)
 ):
     """Delete an entry (for testing convenience - simple hard delete)."""
-    user = await get_current_user_safe(request)
-    if not user:
-        raise HTTPException(status_code=401, detail="Not authenticated")
-    
-    if not user.is_verified:
-        raise HTTPException(status_code=403, detail="Email not verified")
+    user = await get_verified_user_or_401(request)
     
     # Get the entry and verify ownership
-    entry = db.query(Entry).filter(Entry.id == entry_id, Entry.user_id == str(user.id)).first()
+    entry = await get_user_entry(db, str(user.id), entry_id)
     if not entry:
         raise HTTPException(status_code=404, detail="Entry not found")
     
     # Hard delete for testing convenience
-    db.delete(entry)
-    db.commit()
+    await db.delete(entry)
+    await apply_entry_deleted(db, entry)
+    await db.commit()
+    notify_entries_changed(user.id)
     
     return {"status": "deleted", "message": "Entry deleted successfully"}
 
 
+@app.get("/export/entries.csv")
+async def export_entries_csv(
+    request: Request,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    archived: Optional[bool] = None
+):
+    """Stream the user's entries as CSV (ADR-0008), optionally filtered by date range and archive state."""
+    user = await get_verified_user_or_401(request)
+    
+    filename = export_filename(get_request_clock(request, user).today)
+    return StreamingResponse(
+        stream_entries_csv(str(user.id), start_date, end_date, archived),
+        media_type="text/csv",
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+
+@app.post("/import/entries")
+async def import_entries_upload(
+    request: Request,
+    file: UploadFile = File(...),
+    format: Optional[str] = Form(None),
+    db: AsyncSession = Depends(get_async_session)
+):
+    """
+    Bulk import entries from an uploaded CSV or NDJSON file.
+    
+    Returns a report with the number of imported and duplicate rows and the
+    validation errors of every rejected row.
+    """
+    user = await get_verified_user_or_401(request)
+    
+    fmt = format or detect_format(file.filename, file.content_type)
+    if fmt not in IMPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported import format: {fmt}")
+    
+    return await import_entries(db, user, file.file, fmt)
+
+
 # Test endpoints for error handling (development only)
 @app.get("/test/errors")
 async def test_errors_page(request: Request):
@@ -899,6 +1115,7 @@ async def test_http_error(request: Request):
 @app.post("/api/user/update-detected-timezone")
 async def update_detected_timezone(
     request: Request,
+    db: AsyncSession = Depends(get_async_session),
     user: User = Depends(current_active_user)
 ):
     """Simple auto-detection timezone update."""
@@ -907,13 +1124,13 @@ async def update_detected_timezone(
         detected = data.get('detected_timezone')
         
         if detected:
-            # Update detected timezone in sync database
-            db = next(get_session())
-            db_user = db.query(User).filter(User.id == user.id).first()
-            
-            if db_user:
-                db_user.last_detected_timezone = detected
-                db.commit()
+            # current_active_user loaded the user on this request's session
+            # Skip the write (and cache invalidation) when nothing changed
+            if user.last_detected_timezone != detected:
+                user.last_detected_timezone = detected
+                await touch_user_stats(db, str(user.id))
+                await db.commit()
+                invalidate_user(user.id)
                 print(f"Updated detected timezone for {user.email}: {detected}")
         
         return {"success": True, "detected_timezone": detected}
@@ -926,6 +1143,7 @@ async def update_detected_timezone(
 @app.post("/api/user/update-sort-preference")
 async def update_sort_preference(
     request: Request,
+    db: AsyncSession = Depends(get_async_session),
     user: User = Depends(current_active_user)
 ):
     """Update user's entry sort preference."""
@@ -937,14 +1155,12 @@ async def update_sort_preference(
         if sort_preference not in ['newest_first', 'oldest_first']:
             raise HTTPException(status_code=400, detail="Invalid sort preference")
         
-        # Update sort preference in sync database
-        db = next(get_session())
-        db_user = db.query(User).filter(User.id == user.id).first()
-        
-        if db_user:
-            db_user.entry_sort_preference = sort_preference
-            db.commit()
-            print(f"Updated sort preference for {user.email}: {sort_preference}")
+        # current_active_user loaded the user on this request's session
+        user.entry_sort_preference = sort_preference
+        await touch_user_stats(db, str(user.id))
+        await db.commit()
+        invalidate_user(user.id)
+        print(f"Updated sort preference for {user.email}: {sort_preference}")
         
         return {"success": True, "sort_preference": sort_preference}
         
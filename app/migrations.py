@@ -0,0 +1,236 @@
+"""
+Versioned schema migrations.
+
+Every schema change is a numbered migration in MIGRATIONS. The schema_version
+table records which ones have been applied, so startup costs a single
+primary-key lookup on an up-to-date database and only pending migrations
+ever run.
+
+Migrations run in one transaction under a database-wide lock (BEGIN
+IMMEDIATE on SQLite, an advisory lock on PostgreSQL), so several workers
+starting at once apply them exactly once: the first takes the lock and
+the others wait, re-read the version and find nothing left to do.
+
+Migrations are written to be idempotent so databases created before the
+version table existed (by create_all) are brought up to date by replaying
+all of them. Index definitions are written out in each migration rather
+than read from the models, so changing a model never changes what an
+already shipped migration does.
+"""
+
+from datetime import datetime
+from typing import Callable
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, delete, func, inspect, insert, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.schema import CreateTable
+
+# Arbitrary application-wide key for pg_advisory_xact_lock
+_PG_MIGRATION_LOCK_KEY = 0x5D1A7E0
+
+schema_version = Table(
+    "schema_version",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("name", String(100), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+def _add_column_if_missing(connection: Connection, table_name: str, column_name: str, ddl: str) -> None:
+    """ALTER TABLE ... ADD COLUMN unless the column already exists."""
+    existing = {column["name"] for column in inspect(connection).get_columns(table_name)}
+    if column_name not in existing:
+        connection.exec_driver_sql(f'ALTER TABLE "{table_name}" ADD COLUMN {column_name} {ddl}')
+
+
+def create_base_tables(connection: Connection) -> None:
+    """Create the user and entry tables and the unique email index."""
+    from app.models import Entry, User
+
+    # Tables only: CreateTable emits no indexes, whatever the models declare today
+    connection.execute(CreateTable(User.__table__, if_not_exists=True))
+    connection.execute(CreateTable(Entry.__table__, if_not_exists=True))
+    connection.exec_driver_sql('CREATE UNIQUE INDEX IF NOT EXISTS ix_user_email ON "user" (email)')
+
+
+def add_entry_and_user_columns(connection: Connection) -> None:
+    """Add columns introduced after the first release (titles, journal, archive system, timezone and sort preferences)."""
+    _add_column_if_missing(connection, "entry", "title", "VARCHAR")
+    _add_column_if_missing(connection, "entry", "journal", "VARCHAR")
+    _add_column_if_missing(connection, "entry", "updated_at", "TIMESTAMP")
+    _add_column_if_missing(connection, "entry", "is_archived", "BOOLEAN NOT NULL DEFAULT FALSE")
+    _add_column_if_missing(connection, "entry", "archived_at", "TIMESTAMP")
+    _add_column_if_missing(connection, "entry", "archived_reason", "VARCHAR")
+    _add_column_if_missing(connection, "user", "last_detected_timezone", "VARCHAR(50)")
+    _add_column_if_missing(connection, "user", "timezone", "VARCHAR(50) DEFAULT 'UTC'")
+    _add_column_if_missing(connection, "user", "entry_sort_preference", "VARCHAR(20) NOT NULL DEFAULT 'newest_first'")
+    connection.exec_driver_sql("UPDATE entry SET updated_at = created_at WHERE updated_at IS NULL")
+
+
+def create_missing_entry_indexes(connection: Connection) -> None:
+    """Create the composite entry indexes for the dashboard and history, the archive and the one-entry-per-day check."""
+    connection.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_entry_user_archived_entry_date ON entry (user_id, is_archived, entry_date)"
+    )
+    connection.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_entry_user_archived_archived_at ON entry (user_id, is_archived, archived_at)"
+    )
+    connection.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_entry_user_archived_created_at ON entry (user_id, is_archived, created_at)"
+    )
+
+
+def create_user_stats_table(connection: Connection) -> None:
+    """Create the per-user statistics table (rows are built lazily on first read)."""
+    from app.models import UserStats
+
+    UserStats.__table__.create(connection, checkfirst=True)
+
+
+def create_search_index(connection: Connection) -> None:
+    """Create the full-text search index."""
+    from app.search import create_entry_search_index
+
+    create_entry_search_index(connection)
+
+
+def enforce_one_active_entry_per_day(connection: Connection) -> None:
+    """
+    Archive duplicate active entries per (user, entry_date) and add the partial unique index.
+
+    The earliest entry of each day stays active; later ones are archived
+    with reason "duplicate" so nothing is lost. Statistics rows of affected
+    users are dropped and rebuilt lazily on next read.
+    """
+    from app.models import Entry, UserStats
+
+    entry = Entry.__table__
+    keep_ids = (
+        select(func.min(entry.c.id))
+        .where(entry.c.is_archived == False)
+        .group_by(entry.c.user_id, entry.c.entry_date)
+    )
+    duplicates = (entry.c.is_archived == False) & entry.c.id.not_in(keep_ids)
+
+    affected_users = connection.execute(select(entry.c.user_id).where(duplicates).distinct()).scalars().all()
+    if affected_users:
+        connection.execute(
+            update(entry)
+            .where(duplicates)
+            .values(is_archived=True, archived_at=datetime.utcnow(), archived_reason="duplicate")
+        )
+        connection.execute(delete(UserStats.__table__).where(UserStats.__table__.c.user_id.in_(affected_users)))
+
+    # The created_at range check this index served is replaced by the unique index
+    connection.exec_driver_sql("DROP INDEX IF EXISTS ix_entry_user_archived_created_at")
+    active = "NOT is_archived" if connection.dialect.name == "postgresql" else "is_archived = 0"
+    connection.exec_driver_sql(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_entry_user_active_entry_date "
+        f"ON entry (user_id, entry_date) WHERE {active}"
+    )
+
+
+def cover_score_in_entry_date_index(connection: Connection) -> None:
+    """Replace the (user_id, is_archived, entry_date) index with one that also covers score."""
+    connection.exec_driver_sql("DROP INDEX IF EXISTS ix_entry_user_archived_entry_date")
+    connection.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_entry_user_archived_entry_date_score "
+        "ON entry (user_id, is_archived, entry_date, score)"
+    )
+
+
+def add_user_stats_streaks(connection: Connection) -> None:
+    """Add the streak columns to user_stats and drop existing rows so they are rebuilt with streaks on next read."""
+    from app.models import UserStats
+
+    _add_column_if_missing(connection, "user_stats", "longest_streak", "INTEGER NOT NULL DEFAULT 0")
+    _add_column_if_missing(connection, "user_stats", "streak_start", "DATE")
+    _add_column_if_missing(connection, "user_stats", "streak_end", "DATE")
+    connection.execute(delete(UserStats.__table__))
+
+
+def index_search_by_owner(connection: Connection) -> None:
+    """Rebuild the SQLite full-text index with each entry's user_id, so searches only read the owner's postings."""
+    from app.search import recreate_entry_search_index
+
+    recreate_entry_search_index(connection)
+
+
+# (version, name, migration) in the order they must run. Append only: never
+# renumber or edit a migration that has shipped.
+MIGRATIONS: list[tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "create base tables", create_base_tables),
+    (2, "add entry and user columns", add_entry_and_user_columns),
+    (3, "entry composite indexes", create_missing_entry_indexes),
+    (4, "user stats table", create_user_stats_table),
+    (5, "entry search index", create_search_index),
+    (6, "one active entry per day", enforce_one_active_entry_per_day),
+    (7, "entry date index covers score", cover_score_in_entry_date_index),
+    (8, "user stats streaks", add_user_stats_streaks),
+    (9, "search index by owner", index_search_by_owner),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(connection: Connection) -> int:
+    """Highest applied migration version, or 0 for a database without the version table."""
+    if not inspect(connection).has_table("schema_version"):
+        return 0
+    return connection.execute(select(func.max(schema_version.c.version))).scalar() or 0
+
+
+def _lock_for_migrations(connection: Connection) -> None:
+    """Take the database-wide migration lock for the rest of the transaction."""
+    if connection.dialect.name == "sqlite":
+        # Reserve the write lock now instead of on the first write, so two
+        # workers never both read an old version and then race to migrate
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+    elif connection.dialect.name == "postgresql":
+        connection.exec_driver_sql(f"SELECT pg_advisory_xact_lock({_PG_MIGRATION_LOCK_KEY})")
+
+
+def apply_pending_migrations(connection: Connection) -> list[str]:
+    """
+    Apply every migration newer than the database's version under the migration lock.
+
+    Args:
+        connection: Connection inside a transaction that has not executed anything yet
+
+    Returns:
+        list: Names of the migrations applied
+    """
+    _lock_for_migrations(connection)
+    schema_version.create(connection, checkfirst=True)
+    current = get_schema_version(connection)
+
+    applied = []
+    for version, name, migrate in MIGRATIONS:
+        if version <= current:
+            continue
+        migrate(connection)
+        connection.execute(
+            insert(schema_version).values(version=version, name=name, applied_at=datetime.utcnow())
+        )
+        applied.append(f"{version:04d} {name}")
+    return applied
+
+
+async def run_migrations(engine: AsyncEngine) -> list[str]:
+    """
+    Bring the database schema up to date.
+
+    Checks the version without locking first, so an up-to-date database
+    costs one query; otherwise applies pending migrations in a single
+    locked transaction.
+
+    Returns:
+        list: Names of the migrations applied (empty when already current)
+    """
+    async with engine.connect() as connection:
+        if await connection.run_sync(get_schema_version) >= LATEST_VERSION:
+            return []
+
+    async with engine.begin() as connection:
+        return await connection.run_sync(apply_pending_migrations)
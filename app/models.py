@@ -3,7 +3,7 @@ from typing import Optional
 import uuid
 import re
 from pydantic import EmailStr, validator
-from sqlalchemy import Column, String, DateTime, Boolean, event
+from sqlalchemy import Column, String, DateTime, Boolean, Index, event, text
 from sqlalchemy.orm import declarative_base
 from sqlmodel import SQLModel, Field
 from fastapi_users import schemas
@@ -43,6 +43,21 @@ class UserUpdate(schemas.BaseUserUpdate):
 
 class Entry(SQLModel, table=True):
     __tablename__ = "entry"
+    __table_args__ = (
+        # Composite indexes matching the hot access paths: every list query
+        # filters on (user_id, is_archived) and orders or ranges on a date column
+        # score rides along so month facets and statistics are answered from the index alone
+        Index("ix_entry_user_archived_entry_date_score", "user_id", "is_archived", "entry_date", "score"),  # Dashboard, history
+        Index("ix_entry_user_archived_archived_at", "user_id", "is_archived", "archived_at"),  # Archive page
+        # One-entry-per-day rule: entry_date is the user's local date at creation,
+        # and at most one active entry may exist per user and local date
+        Index(
+            "ux_entry_user_active_entry_date", "user_id", "entry_date",
+            unique=True,
+            sqlite_where=text("is_archived = 0"),
+            postgresql_where=text("NOT is_archived")
+        ),
+    )
     
     id: int | None = Field(default=None, primary_key=True)
     user_id: str
@@ -83,6 +98,37 @@ def receive_before_update(mapper, connection, target):
     """Automatically set updated_at timestamp when entry is modified"""
     target.updated_at = datetime.utcnow()
 
+class UserStats(SQLModel, table=True):
+    """Per-user entry statistics, maintained incrementally by the entry write routes"""
+    __tablename__ = "user_stats"
+    
+    user_id: str = Field(primary_key=True)
+    entry_count: int = Field(default=0)  # Active entries
+    score_sum: int = Field(default=0)  # Sum of active entry scores
+    month_count: int = Field(default=0)  # Distinct (year, month) pairs with an active entry
+    archived_count: int = Field(default=0)
+    archived_score_sum: int = Field(default=0)
+    longest_streak: int = Field(default=0)  # Most consecutive days with an active entry
+    streak_start: date | None = Field(default=None)  # First day of the most recent run of consecutive days
+    streak_end: date | None = Field(default=None)  # Last day of that run
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    
+    @property
+    def avg_score(self) -> float:
+        """Average score of active entries"""
+        return self.score_sum / self.entry_count if self.entry_count else 0
+    
+    @property
+    def archived_avg_score(self) -> float:
+        """Average score of archived entries"""
+        return self.archived_score_sum / self.archived_count if self.archived_count else 0
+    
+    def current_streak(self, today: date) -> int:
+        """Consecutive days with an active entry ending on the user's local today"""
+        if self.streak_start is None or not self.streak_start <= today <= self.streak_end:
+            return 0
+        return (today - self.streak_start).days + 1
+
 class EntryUpdate(SQLModel):
     """Model for updating existing entries"""
     title: str | None = None
@@ -139,6 +185,39 @@ class EntryRead(SQLModel):
         """Check if entry is active (not archived)"""
         return not self.is_archived
 
+class EntrySummary:
+    """
+    Read-only projection of an Entry for list views (entry cards).
+    
+    Built straight from Core result rows: no validation, no identity map,
+    no per-instance __dict__. Attribute order matches the columns selected
+    by entry_repository.ENTRY_CARD_COLUMNS.
+    """
+    __slots__ = (
+        "id", "user_id", "entry_date", "title", "score",
+        "created_at", "updated_at", "is_archived", "archived_at", "archived_reason",
+    )
+    
+    def __init__(self, *values):
+        for name, value in zip(self.__slots__, values):
+            object.__setattr__(self, name, value)
+    
+    def __setattr__(self, name, value):
+        raise AttributeError(f"EntrySummary is read-only (cannot set {name!r})")
+    
+    def __repr__(self) -> str:
+        return f"EntrySummary(id={self.id}, entry_date={self.entry_date})"
+    
+    @property
+    def was_edited(self) -> bool:
+        """Check if entry was edited after creation"""
+        return self.updated_at > self.created_at
+    
+    @property
+    def is_active(self) -> bool:
+        """Check if entry is active (not archived)"""
+        return not self.is_archived
+
 class ArchiveRequest(SQLModel):
     """Model for archive operation requests"""
     reason: str | None = None  # Optional categorization: emotional_content, outdated, personal, seasonal, custom
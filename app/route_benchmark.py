@@ -0,0 +1,111 @@
+"""
+Concurrent latency benchmark for the entry pages.
+
+Seeds one verified user with a history of entries in a throwaway SQLite
+database, then sends bursts of concurrent GETs to each page through the
+ASGI app (no network, no server) and prints p50/p99 latency per page:
+
+    python -m app.route_benchmark
+    python -m app.route_benchmark --entries 400 --concurrency 50 --rounds 5
+
+The database is ./db.sqlite3 in a temporary working directory and the app
+is imported only after changing into it, so the same file can be copied
+into an older checkout and run there to compare before and after a change.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import statistics
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+PAGES = ("/", "/entries", "/archive")
+EMAIL = "bench@example.com"
+PASSWORD = "password123"
+
+
+async def _seed(client, entries: int) -> None:
+    """Register, verify and log in the benchmark user, then insert their entries."""
+    from sqlalchemy import insert, select, update
+    from app.database import async_session_maker
+    from app.models import Entry, User
+
+    await client.post("/auth/register", json={"email": EMAIL, "password": PASSWORD})
+    async with async_session_maker() as db:
+        await db.execute(update(User).where(User.email == EMAIL).values(is_verified=True))
+        user_id = str((await db.execute(select(User.id).where(User.email == EMAIL))).scalar_one())
+        start = date.today() - timedelta(days=entries)
+        rows = []
+        for i in range(entries):
+            entry_date = start + timedelta(days=i)
+            created_at = datetime.combine(entry_date, datetime.min.time()) + timedelta(hours=12)
+            rows.append({
+                "user_id": user_id, "entry_date": entry_date, "created_at": created_at, "updated_at": created_at,
+                "success_1": "Finished the quarterly report", "gratitude_1": "A long walk after lunch",
+                "anxiety_1": "Tomorrow's presentation", "score": i % 5 + 1, "is_archived": i % 10 == 0,
+                "archived_at": created_at if i % 10 == 0 else None,
+            })
+        await db.execute(insert(Entry), rows)
+        await db.commit()
+    await client.post("/auth/jwt/login", data={"username": EMAIL, "password": PASSWORD})
+
+
+async def _burst(client, path: str, concurrency: int) -> list[float]:
+    """Latencies of `concurrency` simultaneous GETs of one page."""
+    async def get() -> float:
+        started = time.perf_counter()
+        response = await client.get(path)
+        if response.status_code != 200:
+            raise RuntimeError(f"GET {path} returned {response.status_code}")
+        return time.perf_counter() - started
+
+    return await asyncio.gather(*(get() for _ in range(concurrency)))
+
+
+async def run_benchmark(entries: int, concurrency: int, rounds: int) -> None:
+    """Print p50/p99 latency per page over `rounds` bursts of `concurrency` requests."""
+    import httpx
+    from app.main import app
+
+    results = {}
+    # The app logs every request with print(); keep it out of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        await app.router.startup()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="https://testserver") as client:
+            await _seed(client, entries)
+            for path in PAGES:
+                await _burst(client, path, 1)  # Warm up templates and caches
+                latencies = []
+                started = time.perf_counter()
+                for _ in range(rounds):
+                    latencies.extend(await _burst(client, path, concurrency))
+                results[path] = (sorted(latencies), time.perf_counter() - started)
+        await app.router.shutdown()
+
+    print(f"{entries} entries, {rounds} rounds of {concurrency} concurrent requests per page")
+    for path, (latencies, elapsed) in results.items():
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        print(
+            f"{path:10s} p50={statistics.median(latencies) * 1000:7.1f}ms  p99={p99 * 1000:7.1f}ms  "
+            f"{len(latencies) / elapsed:7.1f} req/s"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent latency benchmark for the entry pages")
+    parser.add_argument("--entries", type=int, default=400, help="Entries seeded for the user")
+    parser.add_argument("--concurrency", type=int, default=50, help="Simultaneous requests per burst")
+    parser.add_argument("--rounds", type=int, default=5, help="Bursts per page")
+    args = parser.parse_args()
+
+    os.chdir(tempfile.mkdtemp(prefix="success-diary-bench-"))
+    # Set before the app is imported, overriding any DATABASE_URL from .env
+    os.environ["DATABASE_URL"] = "sqlite:///./db.sqlite3"
+    os.environ.setdefault("MAIL_FROM", "bench@example.com")
+    os.environ.setdefault("MAIL_SERVER", "localhost")
+    asyncio.run(run_benchmark(args.entries, args.concurrency, args.rounds))
@@ -0,0 +1,224 @@
+"""
+Full-text search over entries using SQLite FTS5.
+
+entry_fts is an external-content FTS5 index over the Entry text fields and
+journal. Triggers on the entry table keep it in sync on every insert,
+update and delete, including bulk Core inserts that bypass the ORM.
+
+The index is shared by all users, so it also indexes each entry's user_id
+and every MATCH requires the owner's user_id phrase: FTS5 intersects the
+search terms with that user's postings instead of ranking every user's
+matches and discarding the foreign ones afterwards.
+
+On PostgreSQL the same search runs on a GIN expression index over the
+entry's tsvector instead, which the database maintains itself; the
+planner combines it with the user_id index.
+"""
+
+import re
+from markupsafe import Markup, escape
+from sqlalchemy import column, func, literal_column, select, table, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import Entry, EntrySummary
+from app.entry_repository import ENTRY_CARD_COLUMNS
+
+# Entry columns covered by the search index
+SEARCH_FIELDS = [
+    "title",
+    "success_1", "success_2", "success_3",
+    "gratitude_1", "gratitude_2", "gratitude_3",
+    "anxiety_1", "anxiety_2", "anxiety_3",
+    "journal",
+]
+
+SEARCH_PAGE_SIZE = 20
+
+# Control characters used as highlight markers so the snippet text can be
+# HTML-escaped before the markers are turned into <mark> tags
+_MARK_START = "\x02"
+_MARK_END = "\x03"
+
+entry_fts = table("entry_fts", column("rowid"))
+
+# PostgreSQL search document. Built from immutable expressions only so the
+# GIN index below can index it and the planner matches queries against it.
+_PG_SEARCH_TEXT = " || ' ' || ".join(f"coalesce({field}, '')" for field in SEARCH_FIELDS)
+_PG_SEARCH_DOCUMENT = f"to_tsvector('english', {_PG_SEARCH_TEXT})"
+
+
+# Indexed columns of entry_fts. user_id comes last: snippet() prefers the
+# first column on a tie, so the owner phrase never becomes the snippet.
+FTS_COLUMNS = [*SEARCH_FIELDS, "user_id"]
+
+_FTS_TRIGGERS = ("entry_fts_ai", "entry_fts_ad", "entry_fts_au")
+
+
+def _fts_schema_statements() -> list[str]:
+    """DDL for the FTS5 table and the triggers that keep it in sync."""
+    fields = ", ".join(FTS_COLUMNS)
+    text_fields = ", ".join(SEARCH_FIELDS)
+    new_values = ", ".join(f"new.{f}" for f in FTS_COLUMNS)
+    old_values = ", ".join(f"old.{f}" for f in FTS_COLUMNS)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS entry_fts USING fts5("
+        f"{fields}, content='entry', content_rowid='id', tokenize='porter unicode61')",
+        f"CREATE TRIGGER IF NOT EXISTS entry_fts_ai AFTER INSERT ON entry BEGIN "
+        f"INSERT INTO entry_fts(rowid, {fields}) VALUES (new.id, {new_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS entry_fts_ad AFTER DELETE ON entry BEGIN "
+        f"INSERT INTO entry_fts(entry_fts, rowid, {fields}) VALUES ('delete', old.id, {old_values}); END",
+        # Only text edits touch the index; archive/unarchive updates skip it
+        f"CREATE TRIGGER IF NOT EXISTS entry_fts_au AFTER UPDATE OF {text_fields} ON entry BEGIN "
+        f"INSERT INTO entry_fts(entry_fts, rowid, {fields}) VALUES ('delete', old.id, {old_values}); "
+        f"INSERT INTO entry_fts(rowid, {fields}) VALUES (new.id, {new_values}); END",
+    ]
+
+
+def create_entry_search_index(connection: Connection) -> None:
+    """Create the FTS5 index and sync triggers, populating it from existing entries."""
+    if connection.dialect.name == "postgresql":
+        connection.exec_driver_sql(
+            f"CREATE INDEX IF NOT EXISTS ix_entry_search ON entry USING GIN ({_PG_SEARCH_DOCUMENT})"
+        )
+        return
+
+    exists = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'entry_fts'")
+    ).first()
+
+    for statement in _fts_schema_statements():
+        connection.exec_driver_sql(statement)
+
+    if not exists:
+        connection.exec_driver_sql("INSERT INTO entry_fts(entry_fts) VALUES ('rebuild')")
+
+
+def recreate_entry_search_index(connection: Connection) -> None:
+    """Drop the FTS5 index and its triggers and build them again in the current shape (no-op on PostgreSQL)."""
+    if connection.dialect.name == "postgresql":
+        return
+
+    for trigger in _FTS_TRIGGERS:
+        connection.exec_driver_sql(f"DROP TRIGGER IF EXISTS {trigger}")
+    connection.exec_driver_sql("DROP TABLE IF EXISTS entry_fts")
+    create_entry_search_index(connection)
+
+
+def _search_terms(query: str) -> list[str]:
+    """Words in free-text search input, ignoring punctuation."""
+    return re.findall(r"[^\W_]+", query or "")
+
+
+def build_match_query(query: str) -> str | None:
+    """
+    Turn free text into a safe FTS5 MATCH expression.
+
+    Each word becomes a quoted prefix term, so punctuation in user input can
+    never produce FTS syntax errors and partially typed words still match.
+    Returns None when the input contains no searchable words.
+    """
+    terms = _search_terms(query)
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def _owner_match_query(user_id: str, match: str) -> str:
+    """Restrict a MATCH expression to one user's entries, with the search terms matching text columns only."""
+    owner = '"' + user_id.replace('"', '""') + '"'
+    return f"user_id : {owner} AND {{{' '.join(SEARCH_FIELDS)}}} : ({match})"
+
+
+def build_tsquery(query: str) -> str | None:
+    """PostgreSQL to_tsquery() equivalent of build_match_query (all words, prefix-matched)."""
+    terms = _search_terms(query)
+    if not terms:
+        return None
+    return " & ".join(f"{term}:*" for term in terms)
+
+
+def highlight_snippet(snippet: str | None) -> Markup:
+    """Escape an FTS snippet and convert its highlight markers into <mark> tags."""
+    escaped = str(escape(snippet or ""))
+    return Markup(
+        escaped.replace(_MARK_START, '<mark class="bg-yellow-200 rounded px-0.5">').replace(_MARK_END, "</mark>")
+    )
+
+
+def _sqlite_search_statement(query: str, user_id: str):
+    """FTS5 match within one user's entries ranked by bm25, selecting the card columns and a snippet."""
+    match = build_match_query(query)
+    if match is None:
+        return None
+    match = _owner_match_query(user_id, match)
+
+    snippet = func.snippet(literal_column("entry_fts"), -1, _MARK_START, _MARK_END, "…", 16)
+    return (
+        select(*ENTRY_CARD_COLUMNS, snippet)
+        .join(entry_fts, entry_fts.c.rowid == Entry.id)
+        .where(text("entry_fts MATCH :match").bindparams(match=match))
+        .order_by(text("bm25(entry_fts)"), Entry.entry_date.desc())
+    )
+
+
+def _postgres_search_statement(query: str):
+    """tsvector match ranked by ts_rank_cd, selecting the card columns and a snippet."""
+    tsquery_text = build_tsquery(query)
+    if tsquery_text is None:
+        return None
+
+    document = literal_column(_PG_SEARCH_DOCUMENT)
+    tsquery = func.to_tsquery(literal_column("'english'"), tsquery_text)
+    snippet = func.ts_headline(
+        literal_column("'english'"),
+        literal_column(_PG_SEARCH_TEXT),
+        tsquery,
+        f"StartSel={_MARK_START}, StopSel={_MARK_END}, MaxFragments=1, MaxWords=16, MinWords=8, FragmentDelimiter=…"
+    )
+    return (
+        select(*ENTRY_CARD_COLUMNS, snippet)
+        .where(document.op("@@")(tsquery))
+        .order_by(func.ts_rank_cd(document, tsquery).desc(), Entry.entry_date.desc())
+    )
+
+
+async def search_entries(
+    db: AsyncSession,
+    user_id: str,
+    query: str,
+    archived: bool = False,
+    page: int = 1,
+    page_size: int = SEARCH_PAGE_SIZE
+) -> tuple[list[tuple[EntrySummary, Markup]], bool]:
+    """
+    Ranked full-text search over a user's entries.
+
+    Args:
+        db: Async database session
+        user_id: Owner of the entries
+        query: Free-text search input
+        archived: Search archived entries instead of active ones
+        page: 1-based page number
+        page_size: Results per page
+
+    Returns:
+        tuple: ([(entry, highlighted_snippet), ...], has_more)
+    """
+    if db.bind.dialect.name == "postgresql":
+        stmt = _postgres_search_statement(query)
+    else:
+        stmt = _sqlite_search_statement(query, user_id)
+    if stmt is None:
+        return [], False
+
+    stmt = (
+        stmt
+        .where(Entry.user_id == user_id, Entry.is_archived == archived)
+        .offset((max(page, 1) - 1) * page_size)
+        .limit(page_size + 1)
+    )
+    result = await db.execute(stmt)
+    rows = result.all()
+
+    has_more = len(rows) > page_size
+    return [(EntrySummary(*row[:-1]), highlight_snippet(row[-1])) for row in rows[:page_size]], has_more
@@ -0,0 +1,241 @@
+"""
+Per-user entry statistics.
+
+The history and archive headers and the dashboard streaks read a single
+UserStats row instead of aggregating every entry. The entry write routes
+apply deltas through the apply_* functions after changing an entry and
+before committing, so the row changes atomically with the entry itself.
+
+The row's updated_at doubles as the user's last-write marker for
+conditional GETs (app.http_cache): every entry write goes through an
+apply_* function and preference and profile writes call touch_user_stats().
+
+Run ``python -m app.stats rebuild`` to recompute every row from the entry
+table and repair any drift.
+"""
+
+import argparse
+import asyncio
+from datetime import datetime, timedelta
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import Entry, UserStats
+from app.entry_repository import (
+    get_active_entry_stats,
+    get_archived_entry_stats,
+    get_active_streak_runs,
+    has_other_active_entry_in_month
+)
+
+
+async def _lock_stats_row(db: AsyncSession, user_id: str) -> UserStats | None:
+    """
+    Load a user's stats row for update, or None if it does not exist.
+    
+    Deltas are read-modify-write in Python, so on PostgreSQL the row is
+    locked (SELECT ... FOR UPDATE) until commit: a concurrent write for the
+    same user waits and then applies its delta to the committed values
+    instead of overwriting them. SQLite has no row locks; the entry flush
+    before every delta already holds its database-wide write lock.
+    """
+    result = await db.execute(
+        select(UserStats)
+        .where(UserStats.user_id == user_id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
+
+
+async def _create_stats_row(db: AsyncSession, user_id: str) -> UserStats:
+    """
+    Insert an empty stats row unless one exists, and load it for update.
+    
+    Concurrent first requests for a user (every user's, after a migration
+    drops the rows) all find the row missing. ON CONFLICT DO NOTHING lets
+    each of them insert; the losers wait for the winner's row and load it
+    instead of failing on the primary key.
+    """
+    insert = postgresql_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+    await db.execute(
+        insert(UserStats).values(user_id=user_id).on_conflict_do_nothing(index_elements=["user_id"])
+    )
+    return await _lock_stats_row(db, user_id)
+
+
+async def rebuild_user_stats(db: AsyncSession, user_id: str) -> UserStats:
+    """Recompute a user's statistics from the entry table (does not commit)."""
+    stats = await _lock_stats_row(db, user_id)
+    if stats is None:
+        # Created before aggregating, so a request that lost the insert race
+        # counts the entries of the transaction that won it
+        stats = await _create_stats_row(db, user_id)
+    
+    values = {
+        **await get_active_entry_stats(db, user_id),
+        **await get_archived_entry_stats(db, user_id),
+        **await get_active_streak_runs(db, user_id),
+        "updated_at": datetime.utcnow()
+    }
+    for field, value in values.items():
+        setattr(stats, field, value)
+    return stats
+
+
+async def get_user_stats(db: AsyncSession, user_id: str) -> UserStats:
+    """
+    Get a user's statistics row in O(1).
+    
+    Users whose entries predate the stats table get their row built once
+    from the entry table on first access.
+    """
+    stats = await db.get(UserStats, user_id)
+    if stats is None:
+        stats = await rebuild_user_stats(db, user_id)
+        await db.commit()
+    return stats
+
+
+async def _stats_for_delta(db: AsyncSession, user_id: str) -> UserStats | None:
+    """
+    Flush the pending entry change and load the stats row to apply a delta to.
+    
+    When the user has no row yet it is rebuilt from the entry table, which
+    already reflects the flushed change, and None is returned so the caller
+    skips its delta.
+    """
+    await db.flush()
+    stats = await _lock_stats_row(db, user_id)
+    if stats is None:
+        await rebuild_user_stats(db, user_id)
+        return None
+    stats.updated_at = datetime.utcnow()
+    return stats
+
+
+async def _month_delta(db: AsyncSession, entry: Entry) -> int:
+    """1 if no other active entry shares the entry's month, else 0."""
+    return 0 if await has_other_active_entry_in_month(db, entry.user_id, entry) else 1
+
+
+async def _refresh_streaks(db: AsyncSession, stats: UserStats) -> None:
+    """Recompute streaks after a change that can split or join runs of days."""
+    for field, value in (await get_active_streak_runs(db, stats.user_id)).items():
+        setattr(stats, field, value)
+
+
+async def _add_streak_day(db: AsyncSession, stats: UserStats, entry_date) -> None:
+    """
+    Account for a new active entry day in the streaks.
+    
+    The usual case, today's entry after the most recent run, extends or
+    starts a run without a query; an earlier date can join runs, so it
+    falls back to recomputing.
+    """
+    if stats.streak_end is not None and entry_date <= stats.streak_end:
+        await _refresh_streaks(db, stats)
+        return
+    
+    if stats.streak_end is None or entry_date > stats.streak_end + timedelta(days=1):
+        stats.streak_start = entry_date
+    stats.streak_end = entry_date
+    stats.longest_streak = max(stats.longest_streak, (stats.streak_end - stats.streak_start).days + 1)
+
+
+async def apply_entry_added(db: AsyncSession, entry: Entry) -> None:
+    """Count a newly added active entry."""
+    stats = await _stats_for_delta(db, entry.user_id)
+    if stats:
+        stats.entry_count += 1
+        stats.score_sum += entry.score
+        stats.month_count += await _month_delta(db, entry)
+        await _add_streak_day(db, stats, entry.entry_date)
+
+
+async def apply_entry_edited(db: AsyncSession, entry: Entry, old_score: int) -> None:
+    """Record an edit, adjusting score totals if the score changed."""
+    stats = await _stats_for_delta(db, entry.user_id)
+    if stats:
+        if entry.is_archived:
+            stats.archived_score_sum += entry.score - old_score
+        else:
+            stats.score_sum += entry.score - old_score
+
+
+async def apply_entry_archived(db: AsyncSession, entry: Entry) -> None:
+    """Move an entry that was just archived from the active to the archived totals."""
+    stats = await _stats_for_delta(db, entry.user_id)
+    if stats:
+        stats.entry_count -= 1
+        stats.score_sum -= entry.score
+        stats.month_count -= await _month_delta(db, entry)
+        stats.archived_count += 1
+        stats.archived_score_sum += entry.score
+        await _refresh_streaks(db, stats)
+
+
+async def apply_entry_unarchived(db: AsyncSession, entry: Entry) -> None:
+    """Move an entry that was just unarchived from the archived to the active totals."""
+    stats = await _stats_for_delta(db, entry.user_id)
+    if stats:
+        stats.archived_count -= 1
+        stats.archived_score_sum -= entry.score
+        stats.entry_count += 1
+        stats.score_sum += entry.score
+        stats.month_count += await _month_delta(db, entry)
+        await _add_streak_day(db, stats, entry.entry_date)
+
+
+async def apply_entry_deleted(db: AsyncSession, entry: Entry) -> None:
+    """Remove an entry that was just passed to db.delete() from the totals."""
+    stats = await _stats_for_delta(db, entry.user_id)
+    if stats:
+        if entry.is_archived:
+            stats.archived_count -= 1
+            stats.archived_score_sum -= entry.score
+        else:
+            stats.entry_count -= 1
+            stats.score_sum -= entry.score
+            stats.month_count -= await _month_delta(db, entry)
+            await _refresh_streaks(db, stats)
+
+
+async def touch_user_stats(db: AsyncSession, user_id: str) -> None:
+    """Mark a user's pages as changed after a preference or profile write (does not commit)."""
+    stats = await db.get(UserStats, user_id)
+    if stats is not None:
+        stats.updated_at = datetime.utcnow()
+
+
+async def rebuild_all_stats(user_id: str | None = None) -> int:
+    """Recompute statistics for one user or every user with entries; returns rows rebuilt."""
+    from app.database import async_session_maker, init_db
+
+    await init_db()
+    async with async_session_maker() as db:
+        if user_id:
+            user_ids = [user_id]
+        else:
+            result = await db.execute(select(Entry.user_id).distinct())
+            user_ids = list(result.scalars().all())
+            result = await db.execute(select(UserStats.user_id))
+            user_ids = sorted(set(user_ids) | set(result.scalars().all()))
+
+        for uid in user_ids:
+            await rebuild_user_stats(db, uid)
+        await db.commit()
+    return len(user_ids)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain per-user entry statistics")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    rebuild_parser = subcommands.add_parser("rebuild", help="Recompute statistics from the entry table")
+    rebuild_parser.add_argument("--user-id", help="Only rebuild this user's statistics")
+    args = parser.parse_args()
+
+    if args.command == "rebuild":
+        count = asyncio.run(rebuild_all_stats(args.user_id))
+        print(f"Rebuilt statistics for {count} user(s)")
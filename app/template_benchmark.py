@@ -0,0 +1,101 @@
+"""
+Cold-start and first-render benchmark for the templates.
+
+Prints how long compiling every template takes from source, from source
+while writing the bytecode cache, and from a warm bytecode cache; then
+starts the app, seeds one user and prints the first and second render of
+each page:
+
+    python -m app.template_benchmark
+    python -m app.template_benchmark --no-precompile
+
+--no-precompile skips precompile_templates() at startup, so each page pays
+its compile cost on the first request instead. The database and bytecode
+cache live in a temporary working directory, so every run starts cold.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+PAGES = ("/login", "/", "/entries", "/archive", "/settings", "/analytics")
+
+
+def _compile_all(bytecode_cache) -> float:
+    """Seconds to compile every template into a fresh environment."""
+    from jinja2 import Environment, FileSystemLoader
+    from app.templating import TEMPLATES_DIR
+
+    started = time.perf_counter()
+    env = Environment(loader=FileSystemLoader(TEMPLATES_DIR), autoescape=True, bytecode_cache=bytecode_cache)
+    for name in env.list_templates(extensions=["html"]):
+        env.get_template(name)
+    return time.perf_counter() - started
+
+
+def compile_times(cache_dir: str) -> dict[str, float]:
+    """Compile times without a bytecode cache, filling it, and loading from it."""
+    from jinja2 import FileSystemBytecodeCache
+
+    bytecode_cache = FileSystemBytecodeCache(cache_dir)
+    return {
+        "source": _compile_all(None),
+        "source, writing bytecode": _compile_all(bytecode_cache),
+        "bytecode cache": _compile_all(bytecode_cache),
+    }
+
+
+async def run_benchmark(precompile: bool) -> None:
+    """Print compile times, app startup time and first/second render per page."""
+    import httpx
+    import app.main
+    from app.route_benchmark import _seed
+
+    compiled = compile_times(tempfile.mkdtemp(prefix="bytecode-", dir="."))
+    if not precompile:
+        app.main.precompile_templates = lambda: 0
+
+    renders = {}
+    # The app logs every request with print(); keep it out of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        await app.main.app.router.startup()
+        startup = time.perf_counter() - started
+        transport = httpx.ASGITransport(app=app.main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="https://testserver") as client:
+            await _seed(client, 60)
+            for path in PAGES:
+                latencies = []
+                for _ in range(2):
+                    started = time.perf_counter()
+                    response = await client.get(path)
+                    latencies.append(time.perf_counter() - started)
+                    if response.status_code != 200:
+                        raise RuntimeError(f"GET {path} returned {response.status_code}")
+                renders[path] = latencies
+        await app.main.app.router.shutdown()
+
+    for label, elapsed in compiled.items():
+        print(f"compile all templates from {label:26s} {elapsed * 1000:7.1f}ms")
+    label = f"app startup {'with' if precompile else 'without'} precompile"
+    print(f"{label:53s} {startup * 1000:7.1f}ms")
+    for path, (first, second) in renders.items():
+        print(f"{path:10s} first={first * 1000:7.1f}ms  second={second * 1000:7.1f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cold-start and first-render benchmark for the templates")
+    parser.add_argument("--no-precompile", action="store_true", help="Skip compiling templates at startup")
+    args = parser.parse_args()
+
+    os.chdir(tempfile.mkdtemp(prefix="success-diary-bench-"))
+    # Set before the app is imported, overriding any DATABASE_URL from .env
+    os.environ["DATABASE_URL"] = "sqlite:///./db.sqlite3"
+    os.environ["TEMPLATE_CACHE_DIR"] = os.path.abspath("templates-cache")
+    os.environ.setdefault("MAIL_FROM", "bench@example.com")
+    os.environ.setdefault("MAIL_SERVER", "localhost")
+    asyncio.run(run_benchmark(precompile=not args.no_precompile))
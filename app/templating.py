@@ -0,0 +1,85 @@
+"""
+Shared Jinja template environment for Success-Diary application.
+
+Every module renders through the single `templates` instance defined here,
+so templates are compiled once per process instead of once per
+Jinja2Templates object, and the path does not depend on the working
+directory.
+
+- Compiled templates are written to a filesystem bytecode cache, so a
+  restarted worker loads bytecode instead of parsing and compiling the
+  source again. Cache entries carry a checksum of the source, so an edited
+  template is recompiled, never served stale. Loaded bytecode is executed,
+  so the cache directory must be private to the user running the app:
+  Jinja's per-user directory by default, or TEMPLATE_CACHE_DIR.
+- precompile_templates() compiles every template at startup, moving the
+  compile cost out of the first request that renders each page.
+  `python -m app.template_benchmark` measures both.
+- With TEMPLATE_AUTO_RELOAD=false (production) Jinja never stats template
+  files to check for changes; edits then need a restart.
+"""
+
+import os
+import stat
+from pathlib import Path
+from fastapi.templating import Jinja2Templates
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+TEMPLATES_DIR = Path(__file__).parent.parent / "templates"
+
+# Unset uses Jinja's per-user cache directory (created 0700, ownership checked);
+# an empty string disables the bytecode cache
+TEMPLATE_CACHE_DIR = os.getenv("TEMPLATE_CACHE_DIR")
+TEMPLATE_AUTO_RELOAD = os.getenv("TEMPLATE_AUTO_RELOAD", "true").lower() in ("1", "true", "yes")
+
+
+def _bytecode_cache() -> FileSystemBytecodeCache | None:
+    """
+    Filesystem bytecode cache, or None when disabled.
+
+    An explicit TEMPLATE_CACHE_DIR is created 0700 and refused unless it is a
+    real directory owned by this user that no other user can write to.
+    """
+    if TEMPLATE_CACHE_DIR is None:
+        return FileSystemBytecodeCache()
+    if not TEMPLATE_CACHE_DIR:
+        return None
+
+    os.makedirs(TEMPLATE_CACHE_DIR, mode=0o700, exist_ok=True)
+    info = os.lstat(TEMPLATE_CACHE_DIR)
+    owned = not hasattr(os, "getuid") or info.st_uid == os.getuid()
+    if not stat.S_ISDIR(info.st_mode) or not owned or info.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        raise RuntimeError(
+            f"TEMPLATE_CACHE_DIR {TEMPLATE_CACHE_DIR} must be a directory owned by this user "
+            "and not writable by other users"
+        )
+    return FileSystemBytecodeCache(TEMPLATE_CACHE_DIR)
+
+
+def create_template_environment() -> Environment:
+    """The Jinja environment for the templates directory (autoescaped, like Jinja2Templates' default)."""
+    return Environment(
+        loader=FileSystemLoader(TEMPLATES_DIR),
+        autoescape=True,
+        auto_reload=TEMPLATE_AUTO_RELOAD,
+        bytecode_cache=_bytecode_cache(),
+    )
+
+
+templates = Jinja2Templates(env=create_template_environment())
+
+
+def precompile_templates() -> int:
+    """
+    Compile every template into the environment's cache.
+
+    Loads bytecode from the filesystem cache when it is current and writes
+    it otherwise, so later starts are cheaper still.
+
+    Returns:
+        int: Number of templates compiled
+    """
+    names = templates.env.list_templates(extensions=["html"])
+    for name in names:
+        templates.env.get_template(name)
+    return len(names)
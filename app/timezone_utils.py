@@ -5,11 +5,39 @@ Handles timezone resolution, date calculations, and user timezone preferences.
 Based on ADR-0005: User Timezone Handling Strategy.
 """
 
-from datetime import date, datetime, time
-from typing import Optional
-import pytz
+import threading
+from bisect import bisect_left
+from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
+from typing import Iterable, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError, available_timezones
 from app.models import User
 
+# strftime patterns for format_user_timestamp's format_type values
+TIMESTAMP_FORMATS = {
+    'full': '%B %d, %Y at %I:%M %p',
+    'short': '%m/%d/%Y %I:%M %p',
+    'time_only': '%I:%M %p',
+}
+
+
+# Bounded because detected timezone names come from the browser
+@lru_cache(maxsize=1024)
+def get_zone(timezone_str: str) -> Optional[ZoneInfo]:
+    """
+    Resolve an IANA timezone name once per process.
+    
+    Args:
+        timezone_str: Timezone string (e.g., 'America/New_York')
+        
+    Returns:
+        ZoneInfo, or None if the name is not a valid timezone
+    """
+    try:
+        return ZoneInfo(timezone_str)
+    except (ZoneInfoNotFoundError, ValueError):
+        return None
+
 
 def get_user_effective_timezone(user: User) -> str:
     """
@@ -25,6 +53,100 @@ def get_user_effective_timezone(user: User) -> str:
     return user.last_detected_timezone or user.timezone or 'UTC'
 
 
+class UserClock:
+    """
+    A user's timezone and local date, resolved once and reused for a whole request.
+    
+    Attributes:
+        timezone_name: The user's effective timezone string
+        zone: Resolved zone (UTC when timezone_name is invalid)
+        is_fallback: True when timezone_name was invalid and UTC is used instead
+        today: Current date in the user's timezone, computed at construction
+    """
+    
+    def __init__(self, user: User):
+        self.timezone_name = get_user_effective_timezone(user)
+        zone = get_zone(self.timezone_name)
+        self.is_fallback = zone is None
+        self.zone = timezone.utc if zone is None else zone
+        self.today = datetime.now(self.zone).date()
+    
+    def date_range(self, target_date: date) -> tuple[datetime, datetime]:
+        """UTC start and end of a local date (see get_user_date_range)."""
+        start_local = datetime.combine(target_date, time.min, tzinfo=self.zone)
+        end_local = datetime.combine(target_date, time.max, tzinfo=self.zone)
+        return (start_local.astimezone(timezone.utc), end_local.astimezone(timezone.utc))
+    
+    def to_local(self, timestamp: datetime) -> datetime:
+        """Convert a timestamp (naive means UTC) to the user's timezone."""
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        return timestamp.astimezone(self.zone)
+    
+    def format(self, timestamp: datetime, format_type: str = 'full') -> str:
+        """Format one timestamp for display (see format_user_timestamp)."""
+        return self.format_many([timestamp], format_type)[0]
+    
+    def format_many(self, timestamps: Iterable[Optional[datetime]], format_type: str = 'full') -> list[str]:
+        """
+        Format a list of timestamps in one pass with the already-resolved zone.
+        
+        Args:
+            timestamps: UTC datetimes; None values format as ''
+            format_type: 'full', 'short', or 'time_only'
+            
+        Returns:
+            list: Formatted strings in the same order
+        """
+        pattern = TIMESTAMP_FORMATS.get(format_type, TIMESTAMP_FORMATS['full'])
+        if self.is_fallback:
+            # Invalid user timezone: show the UTC time and say so
+            pattern += ' UTC'
+        to_local = self.to_local
+        return [to_local(ts).strftime(pattern) if ts is not None else '' for ts in timestamps]
+    
+    def format_entry_times(self, entries) -> dict[int, dict]:
+        """
+        Pre-format the timestamps shown on entry cards for a list of entries.
+        
+        Args:
+            entries: Entries or EntrySummary objects
+            
+        Returns:
+            dict: {entry.id: {"created", "updated", "archived"}} for partials/entry_card.html
+        """
+        entries = list(entries)
+        created = self.format_many([e.created_at for e in entries], 'short')
+        updated = self.format_many([e.updated_at for e in entries], 'short')
+        archived = self.format_many([e.archived_at for e in entries], 'full')
+        return {
+            entry.id: {
+                "created": created[i],
+                "updated": updated[i],
+                "archived": archived[i].split(',')[0],
+            }
+            for i, entry in enumerate(entries)
+        }
+
+
+def get_request_clock(request, user: User) -> UserClock:
+    """
+    The UserClock for the current request, created on first use.
+    
+    Args:
+        request: FastAPI request (the clock is kept on request.state)
+        user: The authenticated user
+        
+    Returns:
+        UserClock: Shared by every helper that needs the user's zone or today in this request
+    """
+    clock = getattr(request.state, "user_clock", None)
+    if clock is None:
+        clock = UserClock(user)
+        request.state.user_clock = clock
+    return clock
+
+
 def get_user_local_date(user: User) -> date:
     """
     Get current date in user's timezone.
@@ -35,14 +157,7 @@ def get_user_local_date(user: User) -> date:
     Returns:
         date: Current date in user's local timezone
     """
-    user_timezone = get_user_effective_timezone(user)
-    
-    try:
-        user_tz = pytz.timezone(user_timezone)
-        return datetime.now(user_tz).date()
-    except pytz.exceptions.UnknownTimeZoneError:
-        # Fallback to UTC if timezone is invalid
-        return datetime.utcnow().date()
+    return UserClock(user).today
 
 
 def get_user_date_range(user: User, target_date: date) -> tuple[datetime, datetime]:
@@ -57,27 +172,7 @@ def get_user_date_range(user: User, target_date: date) -> tuple[datetime, dateti
     Returns:
         tuple: (start_utc, end_utc) as UTC datetime objects
     """
-    user_timezone = get_user_effective_timezone(user)
-    
-    try:
-        user_tz = pytz.timezone(user_timezone)
-        
-        # Start of day in user's timezone
-        start_local = user_tz.localize(datetime.combine(target_date, time.min))
-        # End of day in user's timezone  
-        end_local = user_tz.localize(datetime.combine(target_date, time.max))
-        
-        # Convert to UTC for database queries
-        start_utc = start_local.astimezone(pytz.UTC)
-        end_utc = end_local.astimezone(pytz.UTC)
-        
-        return (start_utc, end_utc)
-        
-    except pytz.exceptions.UnknownTimeZoneError:
-        # Fallback: treat as UTC
-        start_utc = datetime.combine(target_date, time.min).replace(tzinfo=pytz.UTC)
-        end_utc = datetime.combine(target_date, time.max).replace(tzinfo=pytz.UTC)
-        return (start_utc, end_utc)
+    return UserClock(user).date_range(target_date)
 
 
 def format_user_date(user: User, target_date: date, format_type: str = 'full') -> str:
@@ -104,6 +199,9 @@ def format_user_timestamp(user: User, timestamp: datetime, format_type: str = 'f
     """
     Format a UTC timestamp for display in user's local timezone.
     
+    For lists, format through one UserClock (format_many / format_entry_times)
+    instead of calling this per item.
+    
     Args:
         user: User model instance
         timestamp: UTC datetime to format
@@ -112,36 +210,7 @@ def format_user_timestamp(user: User, timestamp: datetime, format_type: str = 'f
     Returns:
         str: Formatted timestamp string in user's timezone
     """
-    try:
-        # Get user's effective timezone
-        user_tz_str = get_user_effective_timezone(user)
-        user_tz = pytz.timezone(user_tz_str)
-        
-        # Convert UTC timestamp to user's timezone
-        if timestamp.tzinfo is None:
-            # Assume UTC if no timezone info
-            utc_timestamp = pytz.utc.localize(timestamp)
-        else:
-            utc_timestamp = timestamp.astimezone(pytz.utc)
-        
-        local_timestamp = utc_timestamp.astimezone(user_tz)
-        
-        # Format based on type
-        if format_type == 'short':
-            return local_timestamp.strftime('%m/%d/%Y %I:%M %p')
-        elif format_type == 'time_only':
-            return local_timestamp.strftime('%I:%M %p')
-        else:  # full
-            return local_timestamp.strftime('%B %d, %Y at %I:%M %p')
-            
-    except Exception as e:
-        # Fallback to UTC if timezone conversion fails
-        if format_type == 'short':
-            return timestamp.strftime('%m/%d/%Y %I:%M %p UTC')
-        elif format_type == 'time_only':
-            return timestamp.strftime('%I:%M %p UTC')
-        else:  # full
-            return timestamp.strftime('%B %d, %Y at %I:%M %p UTC')
+    return UserClock(user).format(timestamp, format_type)
 
 
 def validate_timezone(timezone_str: str) -> bool:
@@ -154,11 +223,7 @@ def validate_timezone(timezone_str: str) -> bool:
     Returns:
         bool: True if valid, False otherwise
     """
-    try:
-        pytz.timezone(timezone_str)
-        return True
-    except pytz.exceptions.UnknownTimeZoneError:
-        return False
+    return get_zone(timezone_str) is not None
 
 
 def get_common_timezones() -> list[dict]:
@@ -201,16 +266,33 @@ def get_common_timezones_with_offsets() -> list[dict]:
     Get list of common timezone choices with UTC offsets for UI dropdowns.
     Format: "(UTC±X) Timezone Name (City)"
     
+    Served from the timezone catalogue, so labels are only recomputed when
+    one of the zones changes its offset.
+    
     Returns:
         list: List of timezone dictionaries with 'value' and 'label' including UTC offsets
     """
-    timezones = get_common_timezones()
-    
-    for tz in timezones:
-        offset = get_timezone_offset_display(tz['value'])
-        tz['label'] = f"({offset}) {tz['label']}"
+    return timezone_catalogue.common()
+
+
+def format_utc_offset(offset: Optional[timedelta]) -> str:
+    """
+    Format a UTC offset like 'UTC-5', 'UTC+5:30' or 'UTC+0'.
     
-    return timezones
+    Args:
+        offset: Offset from UTC (None is treated as zero)
+        
+    Returns:
+        str: Formatted offset
+    """
+    total_minutes = int((offset or timedelta(0)).total_seconds() // 60)
+    if total_minutes == 0:
+        return 'UTC+0'
+    sign = '+' if total_minutes > 0 else '-'
+    hours, minutes = divmod(abs(total_minutes), 60)
+    if minutes == 0:
+        return f'UTC{sign}{hours}'
+    return f'UTC{sign}{hours}:{minutes:02d}'
 
 
 def get_timezone_offset_display(timezone_str: str) -> str:
@@ -223,23 +305,164 @@ def get_timezone_offset_display(timezone_str: str) -> str:
     Returns:
         str: Formatted offset (e.g., 'UTC-5' or 'UTC+9')
     """
-    try:
-        tz = pytz.timezone(timezone_str)
-        now = datetime.now(tz)
-        offset = now.strftime('%z')
-        
-        if offset:
-            # Convert from +0500 to UTC+5 format
-            hours = int(offset[1:3])
-            minutes = int(offset[3:5])
-            sign = '+' if offset[0] == '+' else '-'
-            
-            if minutes == 0:
-                return f'UTC{sign}{hours}'
-            else:
-                return f'UTC{sign}{hours}:{minutes:02d}'
-        else:
-            return 'UTC+0'
+    tz = get_zone(timezone_str)
+    if tz is None:
+        return 'UTC+0'
+    return format_utc_offset(datetime.now(tz).utcoffset())
+
+
+# Regions of the canonical Area/Location IANA names offered in the catalogue;
+# backward-compatibility aliases (US/Eastern, Japan, ...) are left out
+CATALOGUE_REGIONS = (
+    'Africa', 'America', 'Antarctica', 'Arctic', 'Asia', 'Atlantic',
+    'Australia', 'Europe', 'Indian', 'Pacific',
+)
+
+# How far ahead to look for the next offset change before giving up
+_TRANSITION_HORIZON = timedelta(days=400)
+_TRANSITION_STEP = timedelta(days=7)
+
+
+def _offset_at(zone: ZoneInfo, instant: datetime) -> timedelta:
+    """UTC offset of a zone at a UTC instant."""
+    return instant.astimezone(zone).utcoffset()
+
+
+def _next_transition(zones: list[ZoneInfo], now: datetime) -> datetime:
+    """
+    Earliest instant after now at which any of the zones changes its UTC offset.
+    
+    Steps forward a week at a time until some zone's offset differs, then
+    bisects that week down to the minute for the zones that changed.
+    Returns now + _TRANSITION_HORIZON when nothing changes before then.
+    """
+    current = [_offset_at(zone, now) for zone in zones]
+    low = now
+    while low - now < _TRANSITION_HORIZON:
+        high = low + _TRANSITION_STEP
+        upcoming = [_offset_at(zone, high) for zone in zones]
+        changed = [zone for zone, before, after in zip(zones, current, upcoming) if before != after]
+        if changed:
+            earliest = high
+            for zone in changed:
+                before, after = low, high
+                offset = _offset_at(zone, low)
+                while after - before > timedelta(minutes=1):
+                    middle = before + (after - before) / 2
+                    if _offset_at(zone, middle) == offset:
+                        before = middle
+                    else:
+                        after = middle
+                earliest = min(earliest, after)
+            return earliest
+        low, current = high, upcoming
+    return now + _TRANSITION_HORIZON
+
+
+class TimezoneCatalogue:
+    """
+    Every IANA timezone with its current UTC offset label, computed once.
+    
+    Labels embed the current offset, so they only go stale when some zone
+    changes offset; the catalogue records the next such instant across all
+    zones and rebuilds itself on the first access after it.
+    """
+    
+    def __init__(self, common_labels: list[dict]):
+        self._common_labels = common_labels
+        self._lock = threading.Lock()
+        self._expires_at: Optional[datetime] = None
+        self._by_name: dict[str, dict] = {}
+        self._common: list[dict] = []
+        self._search_keys: list[tuple[str, str]] = []
+    
+    @staticmethod
+    def _names() -> list[str]:
+        """Canonical zone names, UTC first."""
+        names = sorted(
+            name for name in available_timezones()
+            if name.split('/', 1)[0] in CATALOGUE_REGIONS and '/' in name
+        )
+        return ['UTC'] + names
+    
+    def _build(self, now: datetime) -> None:
+        """Compute every label and the instant they next go stale."""
+        names = self._names()
+        zones = [get_zone(name) for name in names]
+        
+        by_name = {}
+        for name, zone in zip(names, zones):
+            offset = format_utc_offset(_offset_at(zone, now))
+            display = name.replace('_', ' ')
+            by_name[name] = {'value': name, 'label': f"({offset}) {display}", 'offset': offset}
+        
+        common = []
+        for tz in self._common_labels:
+            offset = by_name[tz['value']]['offset'] if tz['value'] in by_name else get_timezone_offset_display(tz['value'])
+            common.append({'value': tz['value'], 'label': f"({offset}) {tz['label']}"})
+        
+        # Prefix search matches the whole name or any part of it ("new" and
+        # "america/new" both find America/New_York); keys are sorted for bisect
+        search_keys = sorted(
+            (part.lower(), name)
+            for name in names
+            for part in {name, *name.split('/')}
+        )
+        
+        self._by_name = by_name
+        self._common = common
+        self._search_keys = search_keys
+        self._expires_at = _next_transition(zones, now)
+        print(f"Timezone catalogue built: {len(names)} zones, next offset change at {self._expires_at:%Y-%m-%d %H:%M} UTC")
+    
+    def _current(self) -> None:
+        """Rebuild the catalogue if it was never built or an offset has changed since."""
+        now = datetime.now(timezone.utc)
+        if self._expires_at is not None and now < self._expires_at:
+            return
+        with self._lock:
+            if self._expires_at is None or now >= self._expires_at:
+                self._build(now)
+    
+    def all(self) -> list[dict]:
+        """Every zone as {'value', 'label', 'offset'}, UTC first then alphabetical."""
+        self._current()
+        return [dict(tz) for tz in self._by_name.values()]
+    
+    def common(self) -> list[dict]:
+        """The common zones from get_common_timezones with offset-prefixed labels."""
+        self._current()
+        return [dict(tz) for tz in self._common]
+    
+    def label(self, timezone_str: str) -> Optional[str]:
+        """Offset-prefixed label of one zone, or None if it is not in the catalogue."""
+        self._current()
+        tz = self._by_name.get(timezone_str)
+        return tz['label'] if tz else None
+    
+    def search(self, query: str, limit: int = 20) -> list[dict]:
+        """
+        Zones whose name, or any part of it, starts with the query.
+        
+        Args:
+            query: Case-insensitive prefix; spaces match underscores
+            limit: Maximum number of zones to return
             
-    except (pytz.exceptions.UnknownTimeZoneError, ValueError):
-        return 'UTC+0'
\ No newline at end of file
+        Returns:
+            list: Matching zones as {'value', 'label', 'offset'}, alphabetical
+        """
+        self._current()
+        prefix = query.strip().lower().replace(' ', '_')
+        if not prefix:
+            return []
+        
+        keys = self._search_keys
+        matches = set()
+        index = bisect_left(keys, (prefix, ''))
+        while index < len(keys) and keys[index][0].startswith(prefix):
+            matches.add(keys[index][1])
+            index += 1
+        return [dict(self._by_name[name]) for name in sorted(matches)[:limit]]
+
+
+timezone_catalogue = TimezoneCatalogue(get_common_timezones())
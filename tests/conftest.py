@@ -0,0 +1,100 @@
+"""
+Shared pytest fixtures for Success-Diary.
+
+The application builds its engine from DATABASE_URL at import time, so the
+environment is pointed at a throwaway SQLite file here, before any test
+module imports the app; a developer's db.sqlite3 is never touched.
+
+PostgreSQL tests run only when TEST_DATABASE_URL names a PostgreSQL
+database, e.g. postgresql://postgres@localhost/diary_test. Each test gets
+its own schema, dropped afterwards.
+"""
+
+import os
+import tempfile
+import uuid
+
+_TEST_DATA_DIR = tempfile.mkdtemp(prefix="success-diary-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_TEST_DATA_DIR}/app.sqlite3"
+os.environ["TEMPLATE_CACHE_DIR"] = ""
+os.environ.setdefault("MAIL_FROM", "tests@example.com")
+os.environ.setdefault("MAIL_SERVER", "localhost")
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+from app.cache import user_cache
+from app.database import async_session_maker, create_app_engine, normalize_database_url
+from app.migrations import run_migrations
+from app.models import User
+
+TEST_DATABASE_URL = normalize_database_url(os.getenv("TEST_DATABASE_URL", ""))
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def client():
+    """A TestClient for the app, logged in as a new verified user."""
+    from app.main import app
+
+    email = f"user-{uuid.uuid4().hex[:12]}@example.com"
+    with TestClient(app, base_url="https://testserver") as client:
+        client.post("/auth/register", json={"email": email, "password": "password123"})
+
+        async def verify():
+            async with async_session_maker() as db:
+                await db.execute(update(User).where(User.email == email).values(is_verified=True))
+                await db.commit()
+
+        client.portal.call(verify)
+        user_cache.clear()
+        client.post("/auth/jwt/login", data={"username": email, "password": "password123"})
+        yield client
+
+
+@pytest.fixture
+async def sqlite_engine(tmp_path):
+    """A migrated engine on its own SQLite file."""
+    engine = create_app_engine(f"sqlite+aiosqlite:///{tmp_path}/test.sqlite3")
+    await run_migrations(engine)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+async def postgres_schema():
+    """A new, empty schema in the TEST_DATABASE_URL database; skips without PostgreSQL."""
+    if not TEST_DATABASE_URL.startswith("postgresql"):
+        pytest.skip("TEST_DATABASE_URL does not point at PostgreSQL")
+
+    schema = f"test_{uuid.uuid4().hex[:12]}"
+    admin = create_app_engine(TEST_DATABASE_URL)
+    async with admin.begin() as connection:
+        await connection.exec_driver_sql(f"CREATE SCHEMA {schema}")
+    yield schema
+    async with admin.begin() as connection:
+        await connection.exec_driver_sql(f"DROP SCHEMA {schema} CASCADE")
+    await admin.dispose()
+
+
+@pytest.fixture
+def postgres_schema_engine(postgres_schema):
+    """Factory for engines whose unqualified tables live in the test's schema."""
+    def create():
+        return create_app_engine(
+            TEST_DATABASE_URL, connect_args={"server_settings": {"search_path": postgres_schema}}
+        )
+    return create
+
+
+@pytest.fixture
+async def postgres_engine(postgres_schema_engine):
+    """A migrated engine on a fresh PostgreSQL schema."""
+    engine = postgres_schema_engine()
+    await run_migrations(engine)
+    yield engine
+    await engine.dispose()
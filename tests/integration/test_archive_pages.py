@@ -0,0 +1,94 @@
+"""
+Keyset pagination of the archive on (archived_at, id).
+
+Walking every page must list each archived entry exactly once, in order,
+when many entries share an archived_at and when the entry count is an exact
+multiple of the page size. A cursor that encode_archive_cursor could not
+have produced is rejected instead of restarting at page one.
+"""
+
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.entry_repository import decode_archive_cursor, list_archived_entries_page
+from app.models import Entry
+
+pytestmark = pytest.mark.anyio
+
+USER_ID = "archive-user"
+NOON = datetime(2026, 2, 1, 12, 0)
+
+
+async def archive_entries(engine, archived_at: list[datetime]) -> list[tuple[datetime, int]]:
+    """Insert one archived entry per timestamp; returns their (archived_at, id) keys."""
+    entries = [
+        Entry(
+            user_id=USER_ID, entry_date=date(2026, 1, 1) + timedelta(days=day), success_1="s",
+            gratitude_1="g", anxiety_1="a", score=3, is_archived=True, archived_at=moment,
+        )
+        for day, moment in enumerate(archived_at)
+    ]
+    async with AsyncSession(engine, expire_on_commit=False) as db:
+        db.add_all(entries)
+        await db.commit()
+    return [(entry.archived_at, entry.id) for entry in entries]
+
+
+async def walk_pages(engine, sort_preference: str, limit: int) -> list[list[tuple[datetime, int]]]:
+    """Every page from the first until next_cursor is None."""
+    pages, cursor = [], None
+    async with AsyncSession(engine) as db:
+        while True:
+            entries, cursor = await list_archived_entries_page(
+                db, USER_ID, sort_preference, cursor=cursor, limit=limit
+            )
+            pages.append([(entry.archived_at, entry.id) for entry in entries])
+            if cursor is None:
+                return pages
+
+
+@pytest.mark.parametrize("sort_preference", ["newest_first", "oldest_first"])
+@pytest.mark.parametrize("limit", [1, 2, 3])
+async def test_pages_split_ties_on_archived_at(sqlite_engine, sort_preference, limit):
+    # Three entries share one archived_at and two another, so pages end inside a tie
+    keys = await archive_entries(sqlite_engine, [NOON] * 3 + [NOON + timedelta(hours=1)] * 2 + [NOON - timedelta(days=1)])
+
+    pages = await walk_pages(sqlite_engine, sort_preference, limit)
+
+    listed = [key for page in pages for key in page]
+    assert listed == sorted(keys, reverse=sort_preference == "newest_first")
+    assert all(len(page) == limit for page in pages[:-1])
+
+
+async def test_exact_multiple_of_the_page_size_has_no_empty_last_page(sqlite_engine):
+    await archive_entries(sqlite_engine, [NOON + timedelta(minutes=minute) for minute in range(4)])
+
+    assert [len(page) for page in await walk_pages(sqlite_engine, "newest_first", 2)] == [2, 2]
+    assert [len(page) for page in await walk_pages(sqlite_engine, "newest_first", 4)] == [4]
+    assert [len(page) for page in await walk_pages(sqlite_engine, "newest_first", 5)] == [4]
+
+
+async def test_empty_archive_is_one_empty_page(sqlite_engine):
+    assert await walk_pages(sqlite_engine, "newest_first", 2) == [[]]
+
+
+@pytest.mark.parametrize("cursor", [
+    "garbage",
+    "2026-02-01T12:00:00",
+    "2026-02-01T12:00:00_five",
+    "_5",
+    "2026-02-01T12:00:00+00:00_5",
+])
+async def test_malformed_cursor_is_rejected(sqlite_engine, cursor):
+    with pytest.raises(ValueError):
+        decode_archive_cursor(cursor)
+    async with AsyncSession(sqlite_engine) as db:
+        with pytest.raises(ValueError):
+            await list_archived_entries_page(db, USER_ID, "newest_first", cursor=cursor)
+
+
+def test_archive_page_route_rejects_a_malformed_cursor(client):
+    assert client.get("/archive/page", params={"cursor": "garbage"}).status_code == 400
+    assert client.get("/archive/page", params={"cursor": "2026-02-01T12:00:00_5"}).status_code == 200
+    assert client.get("/archive/page", params={"cursor": ""}).status_code == 200
@@ -0,0 +1,78 @@
+"""
+Conditional GETs on the per-user pages.
+
+An unchanged page is answered with an empty 304 for both validators; any
+change to what the page renders, including the user's display name, must
+produce a full response instead. Entry pages check that the entry exists
+and belongs to the user before looking at the validators.
+"""
+
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import update
+from app.database import async_session_maker
+from app.models import Entry, UserStats
+
+
+@pytest.fixture
+def settled(client, monkeypatch):
+    """Move the user's last write and the app start an hour back, so pages carry a Last-Modified."""
+    monkeypatch.setattr("app.http_cache.APP_STARTED_AT", datetime.now(timezone.utc) - timedelta(hours=1))
+    user_id = client.get("/users/me").json()["id"]
+    client.get("/")  # Creates the stats row
+
+    async def backdate():
+        async with async_session_maker() as db:
+            await db.execute(
+                update(UserStats)
+                .where(UserStats.user_id == user_id)
+                .values(updated_at=datetime.utcnow() - timedelta(hours=1))
+            )
+            await db.commit()
+
+    client.portal.call(backdate)
+    return client
+
+
+def test_unchanged_page_is_not_modified(settled):
+    response = settled.get("/entries")
+    etag, last_modified = response.headers["etag"], response.headers["last-modified"]
+
+    by_etag = settled.get("/entries", headers={"If-None-Match": etag})
+    by_date = settled.get("/entries", headers={"If-Modified-Since": last_modified})
+
+    assert by_etag.status_code == 304 and by_etag.content == b""
+    assert by_date.status_code == 304 and by_date.content == b""
+    assert by_etag.headers["etag"] == etag
+
+
+def test_rename_invalidates_cached_pages(settled):
+    response = settled.get("/entries")
+    etag, last_modified = response.headers["etag"], response.headers["last-modified"]
+
+    assert settled.patch("/users/me", json={"display_name": "NewName"}).status_code == 200
+
+    by_etag = settled.get("/entries", headers={"If-None-Match": etag})
+    by_date = settled.get("/entries", headers={"If-Modified-Since": last_modified})
+    assert by_etag.status_code == 200 and "NewName" in by_etag.text
+    assert by_date.status_code == 200 and "NewName" in by_date.text
+
+
+@pytest.mark.parametrize("path, status", [("/entries/{id}", 404), ("/entries/{id}/view", 303)])
+def test_foreign_entry_is_never_not_modified(settled, path, status):
+    async def add_foreign_entry():
+        async with async_session_maker() as db:
+            entry = Entry(
+                user_id=str(uuid.uuid4()), entry_date=date(2026, 1, 1),
+                success_1="s", gratitude_1="g", anxiety_1="a", score=3
+            )
+            db.add(entry)
+            await db.commit()
+            return entry.id
+
+    entry_id = settled.portal.call(add_foreign_entry)
+    response = settled.get(path.format(id=entry_id), headers={"If-None-Match": "*"}, follow_redirects=False)
+
+    assert response.status_code == status
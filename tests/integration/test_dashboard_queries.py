@@ -0,0 +1,70 @@
+"""
+The dashboard renders from at most one user lookup and one entry query.
+
+GET / is served through the application with a `before_cursor_execute`
+listener on its engine. The recent entries, today's entry and the streak
+cards come from one statement (the stats row joined to the entries), and
+the user lookup disappears once the user is cached, however many entries
+the user has.
+"""
+
+import re
+from collections import Counter
+from datetime import date, timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from app.cache import user_cache
+from app.database import engine
+
+
+def count_queries(client: TestClient, path: str) -> Counter:
+    """Statements executed while serving `path`; any statement reading entries counts as "entry"."""
+    queries = Counter()
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        tables = re.findall(r'\b(?:FROM|JOIN)\s+"?(\w+)"?', statement)
+        queries["entry" if "entry" in tables else (tables or [statement.split()[0].upper()])[0]] += 1
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        response = client.get(path)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+    assert response.status_code == 200
+    return queries
+
+
+def test_dashboard_query_count(client):
+    rows = [f"{date.today() - timedelta(days=days_ago)},win,thanks,worry,4" for days_ago in range(1, 21)]
+    csv = "\n".join(["Date,Success_1,Gratitude_1,Anxiety_1,Overall_Rating", *rows])
+    response = client.post("/import/entries", files={"file": ("entries.csv", csv.encode(), "text/csv")})
+    assert response.json()["imported"] == 20
+
+    user_cache.clear()
+    cold = count_queries(client, "/")
+    warm = count_queries(client, "/")
+
+    assert cold == {"user": 1, "entry": 1}
+    # The cached user saves the lookup on later requests
+    assert warm == {"entry": 1}
+
+
+def streak_cards(client: TestClient) -> tuple[str, str]:
+    """(current streak, longest streak) as rendered on the dashboard."""
+    text = client.get("/").text
+    current, longest = re.findall(r'text-2xl font-bold text-(?:indigo|purple)-600">(\d+)<', text)
+    return current, longest
+
+
+def test_new_user_dashboard_builds_the_stats_row(client):
+    assert streak_cards(client) == ("0", "0")
+    assert count_queries(client, "/") == {"entry": 1}
+
+
+def test_dashboard_shows_streaks_from_the_joined_stats_row(client):
+    rows = [f"{date.today() - timedelta(days=days_ago)},win,thanks,worry,4" for days_ago in (0, 1, 2, 5, 6)]
+    csv = "\n".join(["Date,Success_1,Gratitude_1,Anxiety_1,Overall_Rating", *rows])
+    client.post("/import/entries", files={"file": ("entries.csv", csv.encode(), "text/csv")})
+
+    assert streak_cards(client) == ("3", "3")
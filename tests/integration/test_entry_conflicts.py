@@ -0,0 +1,84 @@
+"""
+One active entry per day, enforced by the partial unique index.
+
+A second entry for the same day, whether sent after the first or at the
+same time, is answered with the conflict message instead of a 500, and
+restoring an archived entry onto a day that has an active one is a 409.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+from app.database import async_session_maker
+from app.models import Entry
+
+FORM = {"success_1": "win", "gratitude_1": "thanks", "anxiety_1": "worry", "score": 4}
+HTMX = {"HX-Request": "true"}
+
+
+def active_entry_ids(client: TestClient) -> list[int]:
+    user_id = client.get("/users/me").json()["id"]
+
+    async def ids():
+        async with async_session_maker() as db:
+            result = await db.execute(
+                select(Entry.id).where(Entry.user_id == user_id, Entry.is_archived == False)  # noqa: E712
+            )
+            return list(result.scalars())
+
+    return client.portal.call(ids)
+
+
+def test_second_add_on_the_same_day_is_a_conflict(client):
+    assert "Entry saved successfully" in client.post("/add", data=FORM, headers=HTMX).text
+    [entry_id] = active_entry_ids(client)
+
+    again = client.post("/add", data=FORM, headers=HTMX)
+    redirected = client.post("/add", data=FORM, follow_redirects=False)
+
+    assert again.status_code == 200
+    assert "You already created an entry for" in again.text and f'href="/entries/{entry_id}"' in again.text
+    assert redirected.status_code == 303 and redirected.headers["location"] == f"/entries/{entry_id}"
+    assert active_entry_ids(client) == [entry_id]
+
+
+def test_concurrent_adds_keep_one_entry(client):
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        responses = list(pool.map(lambda _: client.post("/add", data=FORM, headers=HTMX), range(5)))
+
+    assert [response.status_code for response in responses] == [200] * 5
+    assert sum("Entry saved successfully" in response.text for response in responses) == 1
+    assert sum("You already created an entry for" in response.text for response in responses) == 4
+    assert len(active_entry_ids(client)) == 1
+
+
+def test_conflict_with_a_vanished_entry_asks_to_submit_again(client, monkeypatch):
+    client.post("/add", data=FORM, headers=HTMX)
+
+    # The conflicting entry was archived between the failed insert and the lookup
+    async def no_entry(user, target_date, db):
+        return None
+
+    monkeypatch.setattr("app.main.get_entry_for_date", no_entry)
+    fragment = client.post("/add", data=FORM, headers=HTMX)
+    plain = client.post("/add", data=FORM, follow_redirects=False)
+
+    assert fragment.status_code == 200 and "Please submit again" in fragment.text
+    assert plain.status_code == 409
+
+
+def test_unarchive_onto_an_occupied_date_is_a_conflict(client):
+    client.post("/add", data=FORM, headers=HTMX)
+    [archived_id] = active_entry_ids(client)
+    assert client.post(f"/entries/{archived_id}/archive").status_code == 200
+    client.post("/add", data=FORM, headers=HTMX)
+    [active_id] = active_entry_ids(client)
+
+    response = client.post(f"/entries/{archived_id}/unarchive")
+
+    assert response.status_code == 409
+    assert response.json()["error"]["message"].startswith("Another active entry already exists for this date")
+    assert active_entry_ids(client) == [active_id]
+    assert client.post(f"/entries/{active_id}/archive").status_code == 200
+    assert client.post(f"/entries/{archived_id}/unarchive").status_code == 200
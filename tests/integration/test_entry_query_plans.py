@@ -0,0 +1,73 @@
+"""
+The hot entry queries must stay index lookups.
+
+Each repository call is run against a migrated SQLite database, the SQL it
+sends is captured, and EXPLAIN QUERY PLAN must show the entry table being
+searched through an index, never scanned; the paged lists must also get
+their order from the index rather than a sort.
+"""
+
+from datetime import date
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import entry_repository
+
+pytestmark = pytest.mark.anyio
+
+USER_ID = "plan-user"
+TODAY = date(2026, 10, 17)
+
+QUERIES = {
+    "dashboard": lambda db: entry_repository.get_dashboard_entries(db, USER_ID, TODAY),
+    "history month": lambda db: entry_repository.list_active_entries(
+        db, USER_ID, "newest_first", limit=31, year=2026, month=9
+    ),
+    "history facets": lambda db: entry_repository.list_month_facets(db, USER_ID),
+    "history facets by year": lambda db: entry_repository.list_month_facets(db, USER_ID, year=2026),
+    "archive": lambda db: entry_repository.list_archived_entries_page(db, USER_ID, "newest_first"),
+    "archive next page": lambda db: entry_repository.list_archived_entries_page(
+        db, USER_ID, "oldest_first", cursor="2026-01-01T00:00:00_5"
+    ),
+    "archive reasons": lambda db: entry_repository.list_archive_reason_facets(db, USER_ID),
+    "day lookup": lambda db: entry_repository.get_active_entry_on_date(db, USER_ID, TODAY),
+}
+
+# Paged lists must read rows in index order instead of sorting the user's entries
+INDEX_ORDERED = {"history month", "archive", "archive next page"}
+
+
+async def explain(engine, query) -> list[list[str]]:
+    """EXPLAIN QUERY PLAN detail lines for every statement a repository call executes."""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        async with AsyncSession(engine) as db:
+            await query(db)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+    plans = []
+    async with engine.connect() as connection:
+        for statement, parameters in statements:
+            result = await connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)
+            plans.append([row[-1] for row in result])
+    return plans
+
+
+@pytest.mark.parametrize("name", QUERIES)
+async def test_entry_query_uses_index(sqlite_engine, name):
+    plans = await explain(sqlite_engine, QUERIES[name])
+
+    assert plans, f"{name} executed no statement"
+    for plan in plans:
+        entry_steps = [step for step in plan if " entry " in f"{step} "]
+        assert not [step for step in entry_steps if step.startswith("SCAN entry")], plan
+        assert any(step.startswith("SEARCH entry USING") and "INDEX" in step for step in entry_steps), plan
+        if name in INDEX_ORDERED:
+            assert "USE TEMP B-TREE FOR ORDER BY" not in plan, plan
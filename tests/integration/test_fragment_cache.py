@@ -0,0 +1,111 @@
+"""
+Rendered entry cards are reused until something they show changes.
+
+An edit, an archive and a change of the viewer's timezone must each render
+the affected cards again instead of serving the cached HTML.
+"""
+
+from datetime import date, datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from app.database import async_session_maker
+from app.fragment_cache import get_entry_card_cache_info, render_entry_card
+from app.models import Entry, User
+from app.templating import templates
+from app.timezone_utils import UserClock
+
+CSV_HEADER = "Date,Title,Success_1,Gratitude_1,Anxiety_1,Overall_Rating,Created_At"
+# The cards are rendered by the HTMX partials, not by the full pages
+HISTORY = "/entries/sections/2026/1"
+ARCHIVE = "/archive/page"
+
+
+def card_lookups(client: TestClient, path: str) -> tuple[str, int, int]:
+    """(page HTML, card cache hits, card cache misses) for one GET of `path`."""
+    before = get_entry_card_cache_info()
+    response = client.get(path)
+    assert response.status_code == 200
+    after = get_entry_card_cache_info()
+    return response.text, after["hits"] - before["hits"], after["misses"] - before["misses"]
+
+
+def import_entries(client: TestClient, *titles: str) -> list[int]:
+    """Import one titled entry per day from 2026-01-20 backwards; returns their ids, newest first."""
+    rows = [
+        f"2026-01-{20 - i},{title},win,thanks,worry,4,2026-01-{20 - i}T23:30:00"
+        for i, title in enumerate(titles)
+    ]
+    client.post("/import/entries", files={"file": ("entries.csv", "\n".join([CSV_HEADER, *rows]).encode(), "text/csv")})
+    user_id = client.get("/users/me").json()["id"]
+
+    async def entry_ids():
+        async with async_session_maker() as db:
+            result = await db.execute(select(Entry.id).where(Entry.user_id == user_id).order_by(Entry.entry_date.desc()))
+            return list(result.scalars())
+
+    return client.portal.call(entry_ids)
+
+
+def test_unchanged_cards_are_reused(client):
+    import_entries(client, "First day", "Second day")
+
+    card_lookups(client, HISTORY)
+    _, hits, misses = card_lookups(client, HISTORY)
+
+    assert (hits, misses) == (2, 0)
+
+
+def test_edit_renders_the_card_again(client):
+    entry_id, _ = import_entries(client, "First day", "Second day")
+    card_lookups(client, HISTORY)
+
+    response = client.put(f"/entries/{entry_id}", data={
+        "title": "Edited day", "success_1": "win", "gratitude_1": "thanks", "anxiety_1": "worry", "score": 4
+    }, follow_redirects=False)
+    assert response.status_code == 303
+    text, hits, misses = card_lookups(client, HISTORY)
+
+    assert "Edited day" in text and "First day" not in text
+    assert misses == 2 and hits == 0
+
+
+def test_archive_renders_the_card_again(client):
+    entry_id, _ = import_entries(client, "First day", "Second day")
+    card_lookups(client, HISTORY)
+    card_lookups(client, ARCHIVE)
+
+    assert client.post(f"/entries/{entry_id}/archive", follow_redirects=False).status_code in (200, 303)
+    entries, _, _ = card_lookups(client, HISTORY)
+    archive, _, misses = card_lookups(client, ARCHIVE)
+
+    assert "First day" not in entries and "Second day" in entries
+    assert "First day" in archive and "Archived " in archive
+    assert misses == 1
+
+
+def test_timezone_change_renders_the_cards_again(client):
+    import_entries(client, "First day")
+    before, _, _ = card_lookups(client, HISTORY)
+
+    response = client.post("/api/user/update-detected-timezone", json={"detected_timezone": "Asia/Tokyo"})
+    assert response.status_code == 200
+    after, hits, misses = card_lookups(client, HISTORY)
+
+    assert (hits, misses) == (0, 1)
+    assert after != before
+
+
+def test_card_key_changes_with_updated_at():
+    # Without any invalidation: a newer updated_at alone misses the old card
+    clock = UserClock(User(email="card@example.com", hashed_password="x", timezone="UTC"))
+    created = datetime(2026, 1, 1, 12, 0)
+    entry = Entry(
+        id=1, user_id="card-user", entry_date=date(2026, 1, 1), title="Old title",
+        success_1="s", gratitude_1="g", anxiety_1="a", score=3, created_at=created, updated_at=created,
+    )
+    assert "Old title" in render_entry_card(templates.env, clock, entry, "view")
+
+    entry.title, entry.updated_at = "New title", created + timedelta(minutes=5)
+
+    assert "New title" in render_entry_card(templates.env, clock, entry, "view")
@@ -0,0 +1,115 @@
+"""
+Bulk import: duplicates, rejected rows and unreadable files.
+"""
+
+import io
+from datetime import date
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import importer
+from app.models import Entry, User
+
+pytestmark = pytest.mark.anyio
+
+HEADER = "Date,Success_1,Gratitude_1,Anxiety_1,Overall_Rating"
+
+
+def csv_file(*rows: str, header: str = HEADER) -> io.BytesIO:
+    return io.BytesIO("\n".join([header, *rows]).encode())
+
+
+@pytest.fixture
+async def db(sqlite_engine):
+    async with AsyncSession(sqlite_engine) as db:
+        yield db
+
+
+@pytest.fixture
+async def user(db):
+    user = User(email="importer@example.com", hashed_password="x", is_verified=True)
+    db.add(user)
+    await db.commit()
+    await db.refresh(user)
+    return user
+
+
+async def count_entries(db, user_id: str) -> int:
+    return await db.scalar(select(func.count(Entry.id)).where(Entry.user_id == user_id))
+
+
+async def test_repeated_rows_and_imports_are_duplicates(db, user):
+    rows = ["2026-01-01,a,b,c,3", "2026-01-02,a,b,c,4", "2026-01-02,again,b,c,5"]
+
+    user_id = str(user.id)
+    first = await importer.import_entries(db, user, csv_file(*rows))
+    await db.refresh(user)
+    second = await importer.import_entries(db, user, csv_file(*rows))
+
+    assert (first["imported"], first["duplicates"]) == (2, 1)
+    assert (second["imported"], second["duplicates"]) == (0, 3)
+    assert await count_entries(db, user_id) == 2
+
+
+async def test_bad_rows_are_reported_by_column(db, user):
+    header = HEADER + ",Modified_At,Archived,Archived_At"
+    report = await importer.import_entries(db, user, csv_file(
+        "2026-01-01,a,b,c,3,,,",
+        "01/02/2026,a,b,c,3,,,",
+        "2026-01-03,,b,c,3,,,",
+        "2026-01-04,a,b,c,3,yesterday,,",
+        "2026-01-05,a,b,c,3,,true,last week",
+        header=header,
+    ))
+
+    rejected = {error["row"]: [item["field"] for item in error["errors"]] for error in report["errors"]}
+    assert report["imported"] == 1
+    assert rejected == {3: ["entry_date"], 4: ["success_1"], 5: ["updated_at"], 6: ["archived_at"]}
+    messages = [item["message"] for error in report["errors"] for item in error["errors"]]
+    assert "Modified_At must be an ISO 8601 timestamp" in messages
+    assert "Archived_At must be an ISO 8601 timestamp" in messages
+
+
+@pytest.mark.parametrize("content, message", [
+    (b"\xff\xfe\x00bad", "File is not UTF-8 text"),
+    (HEADER.encode() + b"\n2026-01-01,\xe9t\xe9,b,c,3", "File is not UTF-8 text"),
+    (HEADER.encode() + b'\n2026-01-01,"' + b"a" * 200_000 + b'",b,c,3', "Invalid CSV"),
+], ids=["utf-16", "latin-1", "oversized field"])
+async def test_unreadable_file_is_a_report_error(db, user, content, message):
+    report = await importer.import_entries(db, user, io.BytesIO(content))
+
+    assert report["imported"] == 0
+    assert report["errors"][-1]["errors"][0]["message"].startswith(message)
+
+
+def test_undecodable_upload_is_not_a_server_error(client):
+    response = client.post("/import/entries", files={"file": ("entries.csv", b"\xff\xfe\x00bad", "text/csv")})
+
+    assert response.status_code == 200
+    assert response.json()["errors"][0]["errors"][0]["message"].startswith("File is not UTF-8 text")
+
+
+async def test_entry_added_during_import_is_a_duplicate(db, user, monkeypatch):
+    # An entry for 2026-01-02 lands after the import read the user's dates
+    user_id = str(user.id)
+    db.add(Entry(user_id=user_id, entry_date=date(2026, 1, 2), success_1="a", gratitude_1="b", anxiety_1="c", score=3))
+    await db.commit()
+    await db.refresh(user)
+    read_dates = importer._active_entry_dates
+    snapshots = []
+
+    async def stale_first_read(db, user_id):
+        dates = await read_dates(db, user_id)
+        snapshots.append(dates)
+        return set() if len(snapshots) == 1 else dates
+
+    monkeypatch.setattr(importer, "_active_entry_dates", stale_first_read)
+    report = await importer.import_entries(
+        db, user, csv_file("2026-01-01,a,b,c,3", "2026-01-02,a,b,c,3", "2026-01-03,a,b,c,3"), batch_size=2
+    )
+
+    # The conflicting batch is retried without the taken date; the rollback
+    # expired the session's user, and the rows after it still import
+    assert (report["imported"], report["duplicates"], report["errors"]) == (2, 1, [])
+    assert await count_entries(db, user_id) == 3
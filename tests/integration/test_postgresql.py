@@ -0,0 +1,136 @@
+"""
+PostgreSQL-only code paths.
+
+Skipped unless TEST_DATABASE_URL points at PostgreSQL (see conftest.py):
+advisory-locked migrations, GIN/to_tsquery search, the date-arithmetic
+streak query and naive UTC datetimes bound through asyncpg.
+"""
+
+import asyncio
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.entry_repository import get_active_streak_runs, list_archived_entries_page
+from app.migrations import LATEST_VERSION, MIGRATIONS, get_schema_version, run_migrations
+from app.models import Entry
+from app.search import search_entries
+from app.stats import apply_entry_added, get_user_stats, rebuild_user_stats
+
+pytestmark = pytest.mark.anyio
+
+USER_ID = "pg-user"
+
+
+def make_entry(entry_date: date, **values) -> Entry:
+    fields = {"success_1": "success", "gratitude_1": "gratitude", "anxiety_1": "anxiety", "score": 3}
+    fields.update(values)
+    return Entry(user_id=USER_ID, entry_date=entry_date, **fields)
+
+
+async def add_entries(engine, entries: list[Entry]) -> None:
+    async with AsyncSession(engine) as db:
+        db.add_all(entries)
+        await db.commit()
+
+
+async def test_concurrent_migrations_apply_once(postgres_schema_engine):
+    engines = [postgres_schema_engine() for _ in range(3)]
+    try:
+        results = await asyncio.gather(*(run_migrations(engine) for engine in engines))
+        async with engines[0].connect() as connection:
+            version = await connection.run_sync(get_schema_version)
+        assert await run_migrations(engines[0]) == []
+    finally:
+        for engine in engines:
+            await engine.dispose()
+
+    # The advisory lock lets exactly one worker apply them; the others find nothing to do
+    applied = sorted(results, key=len)
+    assert [len(names) for names in applied] == [0, 0, len(MIGRATIONS)]
+    assert version == LATEST_VERSION
+
+
+async def test_concurrent_entry_writes_keep_stats_exact(postgres_engine):
+    await add_entries(postgres_engine, [make_entry(date(2026, 1, 1))])
+    async with AsyncSession(postgres_engine) as db:
+        await get_user_stats(db, USER_ID)
+
+    async def add(day: int):
+        async with AsyncSession(postgres_engine) as db:
+            entry = make_entry(date(2026, 1, 1) + timedelta(days=day), score=day % 5 + 1)
+            db.add(entry)
+            await apply_entry_added(db, entry)
+            await db.commit()
+
+    await asyncio.gather(*(add(day) for day in range(1, 21)))
+
+    # Each delta is applied to the row as the previous writer committed it
+    async with AsyncSession(postgres_engine) as db:
+        stats = await get_user_stats(db, USER_ID)
+        maintained = {field: getattr(stats, field) for field in ("entry_count", "score_sum", "month_count", "longest_streak")}
+        rebuilt = await rebuild_user_stats(db, USER_ID)
+        assert maintained == {field: getattr(rebuilt, field) for field in maintained}
+        assert maintained["entry_count"] == 21
+
+
+async def test_search_matches_word_prefixes_ranked_with_highlights(postgres_engine):
+    await add_entries(postgres_engine, [
+        make_entry(date(2026, 1, 1), success_1="Finished the marathon training plan"),
+        make_entry(date(2026, 1, 2), success_1="Marathon day", journal="Ran the marathon, marathon legs"),
+        make_entry(date(2026, 1, 3), success_1="Quiet reading day"),
+        make_entry(date(2026, 1, 4), success_1="Marathon recap", is_archived=True, archived_at=datetime(2026, 1, 5)),
+    ])
+
+    async with AsyncSession(postgres_engine) as db:
+        results, has_more = await search_entries(db, USER_ID, "marath")
+        archived, _ = await search_entries(db, USER_ID, "marathon", archived=True)
+        punctuation, _ = await search_entries(db, USER_ID, "!!! (marathon) & | :*")
+
+    assert [entry.entry_date for entry, _ in results] == [date(2026, 1, 2), date(2026, 1, 1)]
+    assert not has_more
+    assert all('<mark class="bg-yellow-200 rounded px-0.5">' in str(snippet) for _, snippet in results)
+    assert [entry.entry_date for entry, _ in archived] == [date(2026, 1, 4)]
+    assert len(punctuation) == 2
+
+
+async def test_streak_runs_use_date_arithmetic(postgres_engine):
+    start = date(2026, 3, 1)
+    days = [0, 1, 2, 3, 4, 7, 8, 20, 21, 22]  # Runs of 5, 2 and 3 days
+    await add_entries(postgres_engine, [make_entry(start + timedelta(days=day)) for day in days])
+    # Archived entries never count towards a streak
+    await add_entries(postgres_engine, [
+        make_entry(start + timedelta(days=23), is_archived=True, archived_at=datetime(2026, 4, 1))
+    ])
+
+    async with AsyncSession(postgres_engine) as db:
+        runs = await get_active_streak_runs(db, USER_ID)
+
+    assert runs == {
+        "longest_streak": 5,
+        "streak_start": start + timedelta(days=20),
+        "streak_end": start + timedelta(days=22),
+    }
+
+
+async def test_naive_utc_datetimes_round_trip_and_page(postgres_engine):
+    archived_at = [datetime(2026, 2, 1, 12, 0, 0, microsecond) for microsecond in (1, 2, 3, 4, 5)]
+    await add_entries(postgres_engine, [
+        make_entry(date(2026, 1, day), is_archived=True, archived_at=moment, created_at=moment)
+        for day, moment in enumerate(archived_at, start=1)
+    ])
+
+    pages = []
+    cursor = None
+    async with AsyncSession(postgres_engine) as db:
+        while True:
+            entries, cursor = await list_archived_entries_page(db, USER_ID, "newest_first", cursor=cursor, limit=2)
+            pages.append(entries)
+            if cursor is None:
+                break
+
+    # Microsecond precision survives asyncpg's timestamp binding, keeping keyset pages exact
+    assert [len(page) for page in pages] == [2, 2, 1]
+    listed = [entry.archived_at for page in pages for entry in page]
+    assert listed == sorted(archived_at, reverse=True)
+    assert all(moment.tzinfo is None for moment in listed)
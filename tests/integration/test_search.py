@@ -0,0 +1,99 @@
+"""
+SQLite full-text search: per-user matching and trigger sync.
+
+Entries are written through the ORM; after every insert, edit, archive,
+unarchive and delete the FTS5 integrity check must pass (the index holds
+exactly the entry table's current text) and searches must reflect the
+change.
+"""
+
+import uuid
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import Entry
+from app.search import recreate_entry_search_index, search_entries
+
+pytestmark = pytest.mark.anyio
+
+
+def make_entry(user_id: str, day: int, success: str) -> Entry:
+    return Entry(
+        user_id=user_id, entry_date=date(2026, 1, day), success_1=success,
+        gratitude_1="a quiet morning", anxiety_1="deadlines", score=3,
+    )
+
+
+async def check_index(db: AsyncSession) -> None:
+    """Raises if entry_fts differs from the entry table."""
+    await db.execute(text("INSERT INTO entry_fts(entry_fts, rank) VALUES ('integrity-check', 1)"))
+
+
+async def matches(db: AsyncSession, user_id: str, query: str, archived: bool = False) -> list[int]:
+    results, _ = await search_entries(db, user_id, query, archived=archived)
+    return [entry.id for entry, _ in results]
+
+
+@pytest.fixture
+async def db(sqlite_engine):
+    async with AsyncSession(sqlite_engine, expire_on_commit=False) as db:
+        yield db
+
+
+async def test_search_only_matches_the_users_entries(db):
+    alice, bob = str(uuid.uuid4()), str(uuid.uuid4())
+    entries = [make_entry(alice, 1, "ran a marathon"), make_entry(bob, 1, "marathon training")]
+    db.add_all(entries)
+    await db.commit()
+
+    assert await matches(db, alice, "marath") == [entries[0].id]
+    assert await matches(db, bob, "marathon") == [entries[1].id]
+    assert await matches(db, str(uuid.uuid4()), "marathon") == []
+    # The user_id column is indexed for the owner filter but never matches search terms
+    assert await matches(db, alice, alice.split("-")[0]) == []
+
+
+async def test_index_follows_edits_archives_and_deletes(db):
+    user_id = str(uuid.uuid4())
+    entry = make_entry(user_id, 1, "ran a marathon")
+    db.add(entry)
+    await db.commit()
+    await check_index(db)
+    assert await matches(db, user_id, "marathon") == [entry.id]
+
+    entry.success_1 = "swam across the lake"
+    await db.commit()
+    await check_index(db)
+    assert await matches(db, user_id, "marathon") == []
+    assert await matches(db, user_id, "lake") == [entry.id]
+
+    entry.is_archived, entry.archived_at = True, datetime.utcnow()
+    await db.commit()
+    await check_index(db)
+    assert await matches(db, user_id, "lake") == []
+    assert await matches(db, user_id, "lake", archived=True) == [entry.id]
+
+    entry.is_archived, entry.archived_at = False, None
+    await db.commit()
+    assert await matches(db, user_id, "lake") == [entry.id]
+
+    await db.delete(entry)
+    await db.commit()
+    await check_index(db)
+    assert await matches(db, user_id, "lake") == []
+    assert await matches(db, user_id, "lake", archived=True) == []
+
+
+async def test_recreated_index_covers_existing_entries(sqlite_engine, db):
+    user_id = str(uuid.uuid4())
+    entry = make_entry(user_id, 1, "ran a marathon")
+    db.add(entry)
+    await db.commit()
+
+    async with sqlite_engine.begin() as connection:
+        await connection.run_sync(recreate_entry_search_index)
+
+    await check_index(db)
+    assert await matches(db, user_id, "marathon") == [entry.id]
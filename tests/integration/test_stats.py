@@ -0,0 +1,167 @@
+"""
+Incremental streak maintenance on SQLite.
+
+Entries are written the way the routes write them: change the entry, apply
+the stats delta, commit. After each step the maintained streaks must match
+the gaps-and-islands query, and `python -m app.stats rebuild` must leave
+every maintained value as it was.
+"""
+
+import os
+import subprocess
+import sys
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.entry_repository import get_active_streak_runs
+from app.models import Entry, UserStats
+from app.stats import (
+    apply_entry_added,
+    apply_entry_archived,
+    apply_entry_deleted,
+    apply_entry_edited,
+    apply_entry_unarchived,
+    get_user_stats,
+)
+
+pytestmark = pytest.mark.anyio
+
+USER_ID = "stats-user"
+DAY = date(2026, 3, 1)
+STATS_FIELDS = (
+    "entry_count", "score_sum", "month_count", "archived_count", "archived_score_sum",
+    "longest_streak", "streak_start", "streak_end",
+)
+
+
+@pytest.fixture
+async def db(sqlite_engine):
+    async with AsyncSession(sqlite_engine, expire_on_commit=False) as db:
+        await get_user_stats(db, USER_ID)  # Deltas apply to an existing row
+        yield db
+
+
+async def add(db: AsyncSession, *days: int) -> list[Entry]:
+    entries = []
+    for day in days:
+        entry = Entry(
+            user_id=USER_ID, entry_date=DAY + timedelta(days=day),
+            success_1="s", gratitude_1="g", anxiety_1="a", score=day % 5 + 1,
+        )
+        db.add(entry)
+        await apply_entry_added(db, entry)
+        await db.commit()
+        entries.append(entry)
+    return entries
+
+
+async def archive(db: AsyncSession, entry: Entry) -> None:
+    entry.is_archived, entry.archived_at = True, datetime.utcnow()
+    await apply_entry_archived(db, entry)
+    await db.commit()
+
+
+async def unarchive(db: AsyncSession, entry: Entry) -> None:
+    entry.is_archived, entry.archived_at = False, None
+    await apply_entry_unarchived(db, entry)
+    await db.commit()
+
+
+async def delete(db: AsyncSession, entry: Entry) -> None:
+    await db.delete(entry)
+    await apply_entry_deleted(db, entry)
+    await db.commit()
+
+
+async def streaks(db: AsyncSession) -> tuple[int, date | None, date | None]:
+    """(longest, start, end) as maintained, after checking them against the window query."""
+    stats = await db.get(UserStats, USER_ID, populate_existing=True)
+    maintained = {
+        "longest_streak": stats.longest_streak, "streak_start": stats.streak_start, "streak_end": stats.streak_end,
+    }
+    assert maintained == await get_active_streak_runs(db, USER_ID)
+    return stats.longest_streak, stats.streak_start, stats.streak_end
+
+
+def day(offset: int) -> date:
+    return DAY + timedelta(days=offset)
+
+
+async def test_gap_starts_a_new_run_and_filling_it_joins_them(db):
+    await add(db, 0, 1, 2, 4, 5)
+
+    assert await streaks(db) == (3, day(4), day(5))
+    stats = await db.get(UserStats, USER_ID)
+    assert stats.current_streak(day(5)) == 2
+    assert stats.current_streak(day(7)) == 0
+
+    await add(db, 3)
+
+    assert await streaks(db) == (6, day(0), day(5))
+
+
+async def test_archiving_the_latest_day_shortens_the_run(db):
+    *_, latest = await add(db, 0, 1, 2)
+
+    await archive(db, latest)
+    assert await streaks(db) == (2, day(0), day(1))
+    stats = await db.get(UserStats, USER_ID)
+    assert stats.current_streak(day(2)) == 0
+
+    await unarchive(db, latest)
+    assert await streaks(db) == (3, day(0), day(2))
+
+
+async def test_new_entry_on_an_archived_day_keeps_the_run(db):
+    *_, latest = await add(db, 0, 1, 2)
+    await archive(db, latest)
+
+    await add(db, 2)
+
+    assert await streaks(db) == (3, day(0), day(2))
+
+
+async def test_deleting_a_day_in_the_middle_splits_the_run(db):
+    entries = await add(db, 0, 1, 2, 3, 4, 5)
+
+    await delete(db, entries[2])
+
+    assert await streaks(db) == (3, day(3), day(5))
+
+    await delete(db, entries[5])
+
+    assert await streaks(db) == (2, day(3), day(4))
+
+
+async def test_rebuild_command_agrees_with_incremental_stats(db, tmp_path):
+    entries = await add(db, 0, 1, 2, 4, 5, 6, 7, 30, 31)
+    await archive(db, entries[1])
+    await delete(db, entries[5])
+    old_score, entries[3].score = entries[3].score, 1
+    await apply_entry_edited(db, entries[3], old_score)
+    await db.commit()
+    await archive(db, entries[8])
+    await unarchive(db, entries[1])
+    await delete(db, entries[8])
+    await add(db, 40)
+
+    def snapshot(stats: UserStats) -> dict:
+        return {field: getattr(stats, field) for field in STATS_FIELDS}
+
+    maintained = snapshot(await db.get(UserStats, USER_ID, populate_existing=True))
+    await db.commit()
+
+    # The command runs against the test's database file, in its own process
+    result = subprocess.run(
+        [sys.executable, "-m", "app.stats", "rebuild"],
+        cwd=Path(__file__).parents[2], capture_output=True, text=True,
+        env={**os.environ, "DATABASE_URL": f"sqlite:///{tmp_path}/test.sqlite3"},
+    )
+    assert result.returncode == 0, result.stderr
+    assert "Rebuilt statistics for 1 user(s)" in result.stdout
+
+    rebuilt = snapshot(await db.get(UserStats, USER_ID, populate_existing=True))
+    assert rebuilt == maintained
+    assert maintained["longest_streak"] == 3 and maintained["entry_count"] == 8